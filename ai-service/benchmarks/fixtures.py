@@ -0,0 +1,42 @@
+import cv2
+import numpy as np
+
+
+def synthetic_roof_image(width: int, height: int, seed: int = 0, ext: str = ".jpg") -> bytes:
+    """
+    Deterministic satellite-style rooftop image, encoded like a user upload.
+    Geometry is laid out in relative coordinates so the same scene is drawn at
+    every size, which makes feature drift across resolutions comparable.
+    """
+    rng = np.random.RandomState(seed)
+    s = min(width, height)
+
+    # Surroundings: smooth low-frequency ground texture plus fine grain
+    ground = rng.uniform(60, 140, (max(2, height // 64), max(2, width // 64))).astype(np.float32)
+    ground = cv2.resize(ground, (width, height), interpolation=cv2.INTER_CUBIC)
+    img = np.dstack([ground * 0.9, ground, ground * 0.8])
+    img += rng.normal(0, 6, (height, width, 1)).astype(np.float32)
+
+    # Roof slab with regular tile/seam lines
+    x0, y0, x1, y1 = int(width * 0.18), int(height * 0.15), int(width * 0.85), int(height * 0.82)
+    cv2.rectangle(img, (x0, y0), (x1, y1), (172, 176, 182), -1)
+    seam = max(1, s // 300)
+    for y in range(y0, y1, max(4, s // 40)):
+        cv2.line(img, (x0, y), (x1, y), (150, 152, 158), seam)
+
+    # Obstructions: water tank, AC units, staircase head and its shadow
+    cv2.circle(img, (int(width * 0.32), int(height * 0.30)), int(s * 0.06), (90, 95, 100), -1)
+    for fx in (0.55, 0.62, 0.69):
+        cv2.rectangle(img, (int(width * fx), int(height * 0.25)),
+                      (int(width * (fx + 0.04)), int(height * 0.31)), (205, 208, 210), -1)
+    cv2.rectangle(img, (int(width * 0.60), int(height * 0.55)), (int(width * 0.78), int(height * 0.75)), (120, 110, 105), -1)
+    shadow = np.array([[int(width * 0.60), int(height * 0.75)], [int(width * 0.78), int(height * 0.75)],
+                       [int(width * 0.74), int(height * 0.81)], [int(width * 0.56), int(height * 0.81)]])
+    cv2.fillPoly(img, [shadow], (70, 70, 75))
+
+    img = np.clip(img, 0, 255).astype(np.uint8)
+    params = [cv2.IMWRITE_JPEG_QUALITY, 90] if ext in (".jpg", ".jpeg") else []
+    ok, buf = cv2.imencode(ext, img, params)
+    if not ok:
+        raise RuntimeError(f"Could not encode synthetic image as {ext}")
+    return buf.tobytes()
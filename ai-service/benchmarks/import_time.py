@@ -0,0 +1,90 @@
+"""
+Cold-start import report for the AI service.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --repeat 5 --budget-ms 800 --output imports.json
+
+Each target is imported in a fresh interpreter under `python -X importtime`.
+The report gives its median cumulative import time, the slowest modules it
+pulls in and which heavy dependencies (OpenCV, scikit-learn, ...) were
+loaded. With --budget-ms the exit status is 1 if `main` goes over budget,
+so CI can catch cold-start regressions.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+TARGETS = ["main", "routers.roof_analysis", "routers.panel_placement",
+           "routers.dust_monitoring", "routers.rate_prediction"]
+HEAVY = ["cv2", "PIL", "sklearn", "scipy", "joblib", "httpx", "redis"]
+
+_SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_once(target: str):
+    code = f"import sys, json, {target}; print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=_SERVICE_DIR, capture_output=True, text=True, check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace("import time:", "|").split("|"))
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules, json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure(target: str, repeat: int, top: int) -> dict:
+    totals = []
+    modules, heavy = {}, []
+    for _ in range(repeat):
+        modules, heavy = _import_once(target)
+        totals.append(modules[target][1] / 1000)
+    slowest = sorted(modules.items(), key=lambda kv: kv[1][1], reverse=True)
+    return {
+        "target": target,
+        "cumulativeMs": {"median": round(statistics.median(totals), 1), "min": round(min(totals), 1)},
+        "heavyModulesLoaded": heavy,
+        "slowestImports": [
+            {"module": name, "cumulativeMs": round(cum / 1000, 1), "selfMs": round(self_us / 1000, 1)}
+            for name, (self_us, cum) in slowest[1:top + 1]
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--targets", default=",".join(TARGETS), help="comma-separated module list")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="slowest imports listed per target")
+    parser.add_argument("--budget-ms", type=float, help="fail if importing main takes longer (median)")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    results = [measure(t, args.repeat, args.top) for t in args.targets.split(",")]
+    report = {"benchmark": "import_time", "python": sys.version.split()[0], "repeat": args.repeat, "results": results}
+
+    over_budget = False
+    if args.budget_ms is not None:
+        main_result = next((r for r in results if r["target"] == "main"), None)
+        over_budget = bool(main_result and main_result["cumulativeMs"]["median"] > args.budget_ms)
+        report["budgetMs"] = args.budget_ms
+        report["overBudget"] = over_budget
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    if over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
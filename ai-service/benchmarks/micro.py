@@ -0,0 +1,234 @@
+"""
+Micro-benchmarks for the AI service's CPU hot paths.
+
+    python -m benchmarks.micro --output baseline.json
+    python -m benchmarks.micro --only soiling,packing --repeat 20
+    python -m benchmarks.micro --compare baseline.json --threshold 0.15
+
+Every case is a zero-argument call on fixed, synthetic inputs (no network).
+Each sample runs the call enough times to take at least --min-time seconds;
+the report gives the per-call median, minimum and spread over --repeat
+samples. The JSON is key-sorted and rounded so two runs diff cleanly.
+
+With --compare, each case's median is checked against the baseline report.
+A case is a regression when it is more than --threshold slower. The exit
+status is then 1.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.fixtures import synthetic_roof_image
+from routers.dust_monitoring import calculate_soiling, calculate_soiling_array, forecast_soiling
+from routers.panel_placement import bin_pack_panels
+from routers.rate_prediction import CURRENT_YEAR, forecast_rates, predict_electricity_rates
+from routers.roof_analysis import analyze_image_properties, derive_roof_from_image, shadow_analysis
+from schemas.models import RatePredictionRequest
+from services.model_loader import get_model, get_model_version
+from services.solar_geometry import _annual_shadow_profile
+from services.yield_model import _hourly_yield
+
+IMAGE_SIZES = [(640, 480), (1280, 960), (4000, 3000)]
+
+# Delhi-like monthly climatology for the yield model
+_MONTHLY_GHI = (4.1, 5.0, 6.1, 6.9, 7.2, 6.5, 5.3, 5.0, 5.4, 5.3, 4.5, 3.9)
+_MONTHLY_TEMP = (14.2, 17.5, 23.1, 29.4, 33.0, 33.4, 31.2, 30.1, 29.2, 25.8, 20.3, 15.6)
+
+# L-shaped roof (normalized) with a water tank and a staircase head
+_ROOF_POLYGON = [[0, 0], [1, 0], [1, 0.55], [0.6, 0.55], [0.6, 1], [0, 1]]
+_OBSTRUCTIONS = [
+    {"type": "water_tank", "area": 4.0, "position": {"x": 0.2, "y": 0.2}},
+    {"type": "staircase", "area": 9.0, "position": {"x": 0.8, "y": 0.25, "width": 4.0, "height": 2.25}},
+]
+
+
+def _soiling_cases(loop) -> dict:
+    rng = np.random.RandomState(0)
+    n = 10_000
+    arrays = dict(
+        days_since_cleaning=rng.randint(0, 90, n), pm10=rng.uniform(20, 300, n), pm25=rng.uniform(10, 150, n),
+        aqi=rng.randint(20, 400, n), humidity=rng.uniform(20, 95, n), wind_speed=rng.uniform(0, 30, n),
+        temperature=rng.uniform(5, 45, n), region_type=rng.randint(0, 3, n), season=rng.randint(0, 4, n),
+    )
+    dates = [f"2025-06-{d:02d}" for d in range(1, 8)]
+    weather_fc = [{"date": d, "tempMax": 38.0 + i, "tempMin": 27.0, "rainProbability": 10.0 * i, "windMax": 12.0}
+                  for i, d in enumerate(dates)]
+    aqi_fc = [{"date": d, "pm25": 60.0, "pm10": 140.0, "aqi": 160} for d in dates]
+    return {
+        "calculate_soiling": lambda: calculate_soiling(20, 120.0, 60.0, 150, 45.0, 8.0, 34.0, 1, 2),
+        "calculate_soiling_array[10000 sites]": lambda: calculate_soiling_array(**arrays),
+        "forecast_soiling[7 days]": lambda: forecast_soiling(weather_fc, aqi_fc, 20, 1, 2),
+    }
+
+
+def _packing_cases(loop) -> dict:
+    return {
+        "bin_pack_panels[rectangle 60m2]": lambda: bin_pack_panels(60.0, 1.0, 2.0, 1.2),
+        "bin_pack_panels[L-roof 400m2, 2 orientations]": lambda: bin_pack_panels(
+            400.0, 1.0, 2.0, 1.2, roof_polygon=_ROOF_POLYGON, obstructions=_OBSTRUCTIONS,
+            landscape_row_spacing=0.6,
+        ),
+        "bin_pack_panels[L-roof 400m2, binary layout]": lambda: bin_pack_panels(
+            400.0, 1.0, 2.0, 1.2, roof_polygon=_ROOF_POLYGON, obstructions=_OBSTRUCTIONS,
+            landscape_row_spacing=0.6, layout_format="binary",
+        ),
+    }
+
+
+def _image_cases(loop) -> dict:
+    cases = {}
+    for width, height in IMAGE_SIZES:
+        contents = synthetic_roof_image(width, height)
+        cases[f"analyze_image_properties[{width}x{height}]"] = lambda c=contents: analyze_image_properties(c)
+    props = analyze_image_properties(synthetic_roof_image(1280, 960))
+    cases["derive_roof_from_image"] = lambda: derive_roof_from_image(props, 28.6, 77.2)
+    return cases
+
+
+def _shadow_cases(loop) -> dict:
+    return {
+        "shadow_analysis[endpoint]": lambda: loop.run_until_complete(
+            shadow_analysis(lat=28.6, lng=77.2, roof_area=120.0, date="2025-06-21", utc_offset=None)
+        ),
+        "annual_shadow_profile[uncached]": lambda: _annual_shadow_profile.__wrapped__(28.6, 2025, 60),
+        "hourly_yield[uncached]": lambda: _hourly_yield.__wrapped__(28.75, 28.0, 180.0, _MONTHLY_GHI, _MONTHLY_TEMP),
+    }
+
+
+def _rate_cases(loop) -> dict:
+    request = RatePredictionRequest(region="Pakistan", current_rate=25.0, years_to_predict=10)
+    version = get_model_version("rate_predictor", request.region)
+    return {
+        "predict_electricity_rates[endpoint]": lambda: loop.run_until_complete(predict_electricity_rates(request)),
+        "forecast_rates[uncached]": lambda: forecast_rates.__wrapped__(request.region, 25.0, 10, version),
+    }
+
+
+GROUPS = {
+    "soiling": _soiling_cases,
+    "packing": _packing_cases,
+    "image": _image_cases,
+    "shadow": _shadow_cases,
+    "rates": _rate_cases,
+}
+
+
+def _calibrate(fn, min_time: float) -> int:
+    """Calls per sample so that one sample takes at least min_time"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return number
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.2))
+
+
+def measure(fn, repeat: int, min_time: float) -> dict:
+    fn()  # warm-up: imports, caches, scratch buffers
+    number = _calibrate(fn, min_time)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    median = statistics.median(samples)
+    q1, _, q3 = statistics.quantiles(samples, n=4) if len(samples) > 1 else (median, median, median)
+    return {
+        "medianUs": round(median, 2),
+        "minUs": round(min(samples), 2),
+        "iqrPct": round((q3 - q1) / median * 100, 1) if median else 0.0,
+        "callsPerSample": number,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> dict:
+    """Median ratio (current / baseline) per case present in both reports"""
+    cases = {}
+    for name, stats in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = stats["medianUs"] / max(base["medianUs"], 1e-9)
+        if ratio > 1 + threshold:
+            verdict = "regression"
+        elif ratio < 1 - threshold:
+            verdict = "improvement"
+        else:
+            verdict = "unchanged"
+        cases[name] = {"baselineUs": base["medianUs"], "currentUs": stats["medianUs"],
+                       "ratio": round(ratio, 3), "verdict": verdict}
+    return {
+        "threshold": threshold,
+        "cases": cases,
+        "regressions": sorted(n for n, c in cases.items() if c["verdict"] == "regression"),
+        "missingFromBaseline": sorted(set(results) - set(cases)),
+    }
+
+
+def _environment() -> dict:
+    import cv2
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "machine": platform.machine(),
+        "rateModel": type(get_model("rate_predictor", "Pakistan")).__name__,
+        "rateModelYear": CURRENT_YEAR,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", help=f"comma-separated groups ({', '.join(GROUPS)}); default all")
+    parser.add_argument("--repeat", type=int, default=11, help="samples per case")
+    parser.add_argument("--min-time", type=float, default=0.05, help="seconds per sample")
+    parser.add_argument("--compare", help="baseline report to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed slowdown vs baseline (0.15 = 15%%)")
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    groups = args.only.split(",") if args.only else list(GROUPS)
+    unknown = [g for g in groups if g not in GROUPS]
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(unknown)}")
+
+    loop = asyncio.new_event_loop()
+    try:
+        results = {}
+        for group in groups:
+            for name, fn in GROUPS[group](loop).items():
+                results[name] = {"group": group, **measure(fn, args.repeat, args.min_time)}
+                print(f"  {name}: {results[name]['medianUs']:.1f} us", file=sys.stderr)
+    finally:
+        loop.close()
+
+    report = {"benchmark": "micro", "environment": _environment(), "repeat": args.repeat, "results": results}
+    regressions = []
+    if args.compare:
+        with open(args.compare) as fh:
+            report["comparison"] = compare(results, json.load(fh), args.threshold)
+        regressions = report["comparison"]["regressions"]
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    if regressions:
+        print(f"Regressions over {args.threshold:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
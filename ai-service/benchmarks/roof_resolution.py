@@ -0,0 +1,84 @@
+"""
+Latency and feature drift of roof image analysis across analysis resolutions.
+
+    python -m benchmarks.roof_resolution
+    python -m benchmarks.roof_resolution --sizes 4000x3000 --max-sides 0,2048,1024,512 --output drift.json
+
+Each synthetic image is analyzed at full resolution (the reference) and at
+every requested ROOF_ANALYSIS_MAX_SIDE; drift is the relative difference of
+each feature and of the derived roof estimate versus the reference.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks.fixtures import synthetic_roof_image
+from routers.roof_analysis import analyze_image_properties, derive_roof_from_image
+
+FEATURES = ["mean_brightness", "std_brightness", "edge_density", "mean_hue", "mean_saturation",
+            "mean_value", "laplacian_var", "contour_count"]
+DERIVED = ["totalArea", "usableArea", "estimatedTilt", "confidence"]
+
+
+def _relative_drift(value: float, reference: float) -> float:
+    if reference == 0:
+        return 0.0 if value == 0 else 1.0
+    return round(abs(value - reference) / abs(reference), 4)
+
+
+def _time_analysis(contents: bytes, max_side: int, repeat: int):
+    timings = []
+    props = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        props = analyze_image_properties(contents, max_side=max_side)
+        timings.append((time.perf_counter() - start) * 1000)
+    return props, timings
+
+
+def run(sizes, max_sides, repeat: int) -> dict:
+    results = []
+    for width, height in sizes:
+        contents = synthetic_roof_image(width, height)
+        reference, ref_timings = _time_analysis(contents, 0, repeat)
+        ref_roof = derive_roof_from_image(reference, 28.6, 77.2)
+
+        for max_side in max_sides:
+            props, timings = (reference, ref_timings) if max_side == 0 else _time_analysis(contents, max_side, repeat)
+            roof = derive_roof_from_image(props, 28.6, 77.2)
+            results.append({
+                "image": f"{width}x{height}",
+                "maxSide": max_side,
+                "latencyMs": {
+                    "median": round(statistics.median(timings), 2),
+                    "min": round(min(timings), 2),
+                },
+                "speedup": round(statistics.median(ref_timings) / max(statistics.median(timings), 1e-9), 2),
+                "featureDrift": {f: _relative_drift(props[f], reference[f]) for f in FEATURES},
+                "roofDrift": {f: _relative_drift(roof[f], ref_roof[f]) for f in DERIVED},
+                "roofTypeChanged": roof["roofType"] != ref_roof["roofType"],
+            })
+    return {"benchmark": "roof_resolution", "repeat": repeat, "results": results}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1280x960,4000x3000", help="comma-separated WxH list")
+    parser.add_argument("--max-sides", default="0,2048,1024,512", help="0 = full resolution")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    sizes = [tuple(int(v) for v in size.split("x")) for size in args.sizes.split(",")]
+    max_sides = [int(v) for v in args.max_sides.split(",")]
+    report = json.dumps(run(sizes, max_sides, args.repeat), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
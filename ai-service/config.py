@@ -7,11 +7,54 @@ class Settings(BaseSettings):
     ENV: str = "development"
     REDIS_URL: str = "redis://localhost:6379/0"
     NASA_POWER_API_URL: str = "https://power.larc.nasa.gov/api/temporal/monthly/point"
+    OPEN_METEO_FORECAST_URL: str = "https://api.open-meteo.com/v1/forecast"
+    OPEN_METEO_AIR_QUALITY_URL: str = "https://air-quality-api.open-meteo.com/v1/air-quality"
+    OPENWEATHER_API_URL: str = "https://api.openweathermap.org/data/2.5/weather"
+    IRRADIANCE_DB_PATH: str = "./data/irradiance.sqlite3"
     OPENWEATHER_API_KEY: str = ""
     AQICN_API_KEY: str = ""
     MODEL_DIR: str = "./ml_models/saved"
+    MODEL_RELOAD_INTERVAL: float = 30.0  # seconds between model file mtime checks; 0 = never reload
     ALLOWED_ORIGINS: str = "http://localhost:3000,http://localhost:5000"
 
+    # Outbound HTTP (shared keep-alive clients, one pool per upstream host)
+    HTTP2_ENABLED: bool = True
+    HTTP_TIMEOUT: float = 8.0
+    HTTP_CONNECT_TIMEOUT: float = 3.0
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 20
+    HTTP_MAX_KEEPALIVE_PER_HOST: int = 10
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    OPEN_METEO_TIMEOUT: float = 8.0
+    NASA_POWER_TIMEOUT: float = 10.0
+    OPENWEATHER_TIMEOUT: float = 5.0
+
+    # Current weather/AQI cache (shared by all sites in the same lat/lng tile)
+    WEATHER_TILE_DEG: float = 0.05
+    WEATHER_CACHE_TTL: int = 900  # Open-Meteo refreshes "current" every 15 min
+    WEATHER_CACHE_MAX_ENTRIES: int = 20000
+    DUST_BATCH_CONCURRENCY: int = 16  # distinct tiles fetched in parallel per batch
+
+    # Roof image analysis worker pool (OpenCV runs off the event loop)
+    IMAGE_POOL_KIND: str = "thread"  # "thread" or "process"
+    IMAGE_POOL_WORKERS: int = 0  # 0 = one per CPU core
+    IMAGE_POOL_MAX_QUEUE: int = 16  # waiting jobs before answering 429
+    ROOF_UPLOAD_MAX_BYTES: int = 15 * 1024 * 1024
+    ROOF_ANALYSIS_MAX_SIDE: int = 1024  # long side (px) uploads are decoded at, min 1024 (edge/texture frame); 0 = full
+    ROOF_BATCH_WORKERS: int = 0  # batch analysis process pool; 0 = one per CPU core
+    ROOF_BATCH_MAX_QUEUE: int = 64
+    ROOF_BATCH_MAX_ITEMS: int = 500
+    ROOF_BATCH_MAX_ARCHIVE_BYTES: int = 512 * 1024 * 1024
+    ROOF_CACHE_MAX_ENTRIES: int = 512  # in-process image-analysis results (by content hash)
+    ROOF_CACHE_REDIS: bool = False  # also share results through REDIS_URL
+    ROOF_CACHE_REDIS_TTL: int = 604800  # seconds; 0 = no expiry
+
+    # Per-request stage timings (Server-Timing header, optional OTLP/JSON span file)
+    TRACING_ENABLED: bool = False
+    TRACE_EXPORT_PATH: str = ""  # e.g. ./data/traces.jsonl; empty = header only
+
+    # Shadow simulation
+    SHADOW_TIME_STEP_MINUTES: int = 60  # resolution of the full-year sun-path grid
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,234 @@
+"""
+Load driver replaying the traffic the Node server sends to the AI service.
+
+    python -m loadtest.driver --scenario cron --sites 5000 --concurrency 200
+    python -m loadtest.driver --scenario mixed --sites 2000 --designs 100 --output run.json
+
+Scenarios:
+  cron    the daily monitoring burst: one dust request per site, fired at
+          --concurrency. This uses GET /ai/dust/current/{lat}/{lng}, or
+          POST /ai/dust/current/batch with --batch-size.
+  design  design-flow uploads: roof-analysis with an image, then
+          panel-placement and shadow-analysis for the result, --designs
+          flows at --design-concurrency.
+  mixed   both at once.
+
+Run the service against `python -m loadtest.stub_upstream` so no live API is
+called. The report gives each endpoint's throughput, error count and
+p50/p95/p99 latency. It also counts responses built from fallback
+estimates, which show upstream failures behind a 200.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from benchmarks.fixtures import synthetic_roof_image
+
+# Sites are spread over Pakistan / north India, where the users are
+SITE_BOUNDS = ((24.0, 34.0), (67.0, 78.0))
+
+
+class Recorder:
+    """Latencies and outcomes per endpoint"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.fallbacks = Counter()
+
+    def record(self, endpoint: str, seconds: float, status):
+        self.latencies[endpoint].append(seconds * 1000)
+        self.statuses[endpoint][str(status)] += 1
+
+    def report(self, elapsed: float) -> dict:
+        endpoints = {}
+        for endpoint, latencies in self.latencies.items():
+            latencies.sort()
+            statuses = self.statuses[endpoint]
+            endpoints[endpoint] = {
+                "requests": len(latencies),
+                "errors": sum(n for status, n in statuses.items() if not status.startswith("2")),
+                "statuses": dict(statuses),
+                "fallbackResponses": self.fallbacks[endpoint],
+                "throughputRps": round(len(latencies) / elapsed, 1),
+                "latencyMs": {
+                    "p50": _percentile(latencies, 50),
+                    "p95": _percentile(latencies, 95),
+                    "p99": _percentile(latencies, 99),
+                    "max": round(latencies[-1], 1),
+                    "mean": round(sum(latencies) / len(latencies), 1),
+                },
+            }
+        total = sum(e["requests"] for e in endpoints.values())
+        return {
+            "elapsedSeconds": round(elapsed, 2),
+            "requests": total,
+            "errors": sum(e["errors"] for e in endpoints.values()),
+            "throughputRps": round(total / elapsed, 1) if elapsed else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return round(sorted_values[int(rank) - 1], 1)
+
+
+async def _timed(recorder: Recorder, endpoint: str, send):
+    """Run one request, record it, return the response (None on a transport error)"""
+    start = time.perf_counter()
+    try:
+        response = await send()
+    except httpx.HTTPError as e:
+        recorder.record(endpoint, time.perf_counter() - start, type(e).__name__)
+        return None
+    recorder.record(endpoint, time.perf_counter() - start, response.status_code)
+    return response
+
+
+def make_sites(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    (lat0, lat1), (lng0, lng1) = SITE_BOUNDS
+    return [
+        {"site_id": f"site-{i}", "lat": round(rng.uniform(lat0, lat1), 5), "lng": round(rng.uniform(lng0, lng1), 5),
+         "days_since_cleaning": rng.randint(1, 60)}
+        for i in range(count)
+    ]
+
+
+async def run_cron(client: httpx.AsyncClient, recorder: Recorder, sites: list, concurrency: int, batch_size: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_site(site):
+        async with semaphore:
+            endpoint = "GET /ai/dust/current/{lat}/{lng}"
+            response = await _timed(recorder, endpoint, lambda: client.get(
+                f"/ai/dust/current/{site['lat']}/{site['lng']}",
+                params={"days_since_cleaning": site["days_since_cleaning"]},
+            ))
+            if response is not None and response.status_code == 200:
+                if response.json()["data"].get("dataSource") == "estimated":
+                    recorder.fallbacks[endpoint] += 1
+
+    async def one_batch(chunk):
+        async with semaphore:
+            endpoint = "POST /ai/dust/current/batch"
+            lines = []
+
+            async def send():
+                # The endpoint streams NDJSON; time the whole stream like the cron does
+                async with client.stream("POST", "/ai/dust/current/batch", json={"sites": chunk}) as response:
+                    lines.extend([line async for line in response.aiter_lines() if line.strip()])
+                return response
+
+            response = await _timed(recorder, endpoint, send)
+            if response is not None and response.status_code == 200:
+                for line in lines:
+                    result = json.loads(line)
+                    if not result.get("success") or result["data"].get("dataSource") == "estimated":
+                        recorder.fallbacks[endpoint] += 1
+
+    if batch_size > 0:
+        chunks = [sites[i:i + batch_size] for i in range(0, len(sites), batch_size)]
+        await asyncio.gather(*(one_batch(chunk) for chunk in chunks))
+    else:
+        await asyncio.gather(*(one_site(site) for site in sites))
+
+
+async def run_designs(client: httpx.AsyncClient, recorder: Recorder, sites: list, count: int,
+                      concurrency: int, images: list):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_flow(index: int):
+        site = sites[index % len(sites)]
+        async with semaphore:
+            response = await _timed(recorder, "POST /ai/roof-analysis", lambda: client.post(
+                "/ai/roof-analysis",
+                files={"file": ("roof.jpg", images[index % len(images)], "image/jpeg")},
+                data={"lat": str(site["lat"]), "lng": str(site["lng"])},
+            ))
+            if response is None or response.status_code != 200:
+                return
+            usable_area = response.json()["data"].get("usableArea") or 75.0
+
+            endpoint = "POST /ai/panel-placement"
+            response = await _timed(recorder, endpoint, lambda: client.post("/ai/panel-placement", json={
+                "usable_area": usable_area, "lat": site["lat"], "lng": site["lng"],
+                "roof_tilt": 15, "panel_wattage": 400,
+            }))
+            if response is not None and response.status_code == 200:
+                if response.json()["data"]["solarIrradiance"].get("source") != "NASA POWER API":
+                    recorder.fallbacks[endpoint] += 1
+
+            await _timed(recorder, "POST /ai/shadow-analysis", lambda: client.post(
+                "/ai/shadow-analysis", params={"lat": site["lat"], "lng": site["lng"], "roof_area": usable_area},
+            ))
+
+    await asyncio.gather(*(one_flow(i) for i in range(count)))
+
+
+async def run(args) -> dict:
+    sites = make_sites(args.sites, args.seed)
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.concurrency + args.design_concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+        jobs = []
+        if args.scenario in ("cron", "mixed"):
+            jobs.append(run_cron(client, recorder, sites, args.concurrency, args.batch_size))
+        if args.scenario in ("design", "mixed"):
+            # A few distinct roofs, so repeat uploads exercise the result cache as in production
+            width, height = (int(v) for v in args.image_size.split("x"))
+            images = [synthetic_roof_image(width, height, seed=i) for i in range(args.unique_images)]
+            jobs.append(run_designs(client, recorder, sites, args.designs, args.design_concurrency, images))
+        start = time.perf_counter()
+        await asyncio.gather(*jobs)
+        elapsed = time.perf_counter() - start
+
+    return {"benchmark": "loadtest", "scenario": args.scenario, "baseUrl": args.base_url,
+            "sites": args.sites, "designs": args.designs if args.scenario != "cron" else 0,
+            **recorder.report(elapsed)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0],
+                                     formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     epilog=__doc__.split("Scenarios:")[1])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--scenario", choices=["cron", "design", "mixed"], default="mixed")
+    parser.add_argument("--sites", type=int, default=1000, help="sites in the cron burst")
+    parser.add_argument("--concurrency", type=int, default=100, help="concurrent cron requests")
+    parser.add_argument("--batch-size", type=int, default=0, help="use the batch endpoint with this many sites")
+    parser.add_argument("--designs", type=int, default=50, help="design flows to run")
+    parser.add_argument("--design-concurrency", type=int, default=8)
+    parser.add_argument("--image-size", default="1280x960")
+    parser.add_argument("--unique-images", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-request timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    for endpoint, stats in sorted(report["endpoints"].items()):
+        lat = stats["latencyMs"]
+        print(f"  {endpoint}: {stats['requests']} req, {stats['throughputRps']} rps, errors {stats['errors']}, "
+              f"p50 {lat['p50']} / p95 {lat['p95']} / p99 {lat['p99']} ms", file=sys.stderr)
+
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Local stand-in for the upstream APIs the AI service calls, for load tests.
+
+    python -m loadtest.stub_upstream --port 9100 --latency-ms 120 --jitter-ms 60 --error-rate 0.02
+
+Serves the Open-Meteo forecast and air-quality, NASA POWER monthly point
+and OpenWeatherMap current-weather endpoints, with the response fields the
+routers actually read. The values are deterministic per coordinate. Each
+API listens on its own port (--port, +1, +2, +3), so the service keeps one
+connection pool per upstream as it does in production. The settings to
+point the service at the stub are printed on startup.
+
+Every response waits latency ± jitter. A share of requests (--error-rate)
+answers --error-status, and a share (--timeout-rate) stalls for
+--stall-ms, long enough to hit the service's timeouts. All of these can be
+changed at runtime:
+
+    curl -X POST localhost:9100/_stub/config -H 'content-type: application/json' -d '{"errorRate": 0.5}'
+    curl localhost:9100/_stub/stats
+"""
+import argparse
+import asyncio
+import random
+import zlib
+from collections import Counter
+from datetime import date, timedelta
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# (settings name, path, port offset)
+UPSTREAMS = [
+    ("OPEN_METEO_FORECAST_URL", "/v1/forecast", 0),
+    ("OPEN_METEO_AIR_QUALITY_URL", "/v1/air-quality", 1),
+    ("NASA_POWER_API_URL", "/api/temporal/monthly/point", 2),
+    ("OPENWEATHER_API_URL", "/data/2.5/weather", 3),
+]
+
+_config = {
+    "latencyMs": 80.0,
+    "jitterMs": 40.0,
+    "errorRate": 0.0,
+    "errorStatus": 503,
+    "timeoutRate": 0.0,
+    "stallMs": 30000.0,
+}
+_stats = Counter()
+
+app = FastAPI(title="SmartSolar upstream stub")
+
+
+def _site_rng(request: Request, salt: str) -> random.Random:
+    """Deterministic per (coordinate, endpoint), so repeat calls agree like a real API"""
+    lat = request.query_params.get("latitude") or request.query_params.get("lat") or "0"
+    lng = request.query_params.get("longitude") or request.query_params.get("lon") or "0"
+    return random.Random(zlib.crc32(f"{salt}:{float(lat):.3f}:{float(lng):.3f}".encode()))
+
+
+async def _simulate(endpoint: str):
+    """Latency and fault injection; returns an error response or None"""
+    _stats[f"{endpoint}.requests"] += 1
+    if random.random() < _config["timeoutRate"]:
+        _stats[f"{endpoint}.stalled"] += 1
+        await asyncio.sleep(_config["stallMs"] / 1000)
+    else:
+        delay = _config["latencyMs"] + random.uniform(-1, 1) * _config["jitterMs"]
+        await asyncio.sleep(max(0.0, delay) / 1000)
+    if random.random() < _config["errorRate"]:
+        _stats[f"{endpoint}.errors"] += 1
+        return JSONResponse({"error": True, "reason": "injected by stub"}, status_code=_config["errorStatus"])
+    return None
+
+
+@app.get("/v1/forecast")
+async def open_meteo_forecast(request: Request):
+    error = await _simulate("forecast")
+    if error:
+        return error
+    rng = _site_rng(request, "forecast")
+    if "daily" in request.query_params:
+        days = int(request.query_params.get("forecast_days", 7))
+        start = date.today()
+        return {"daily": {
+            "time": [(start + timedelta(days=i)).isoformat() for i in range(days)],
+            "temperature_2m_max": [round(rng.uniform(28, 42), 1) for _ in range(days)],
+            "temperature_2m_min": [round(rng.uniform(16, 27), 1) for _ in range(days)],
+            "precipitation_probability_max": [rng.randint(0, 80) for _ in range(days)],
+            "wind_speed_10m_max": [round(rng.uniform(5, 30), 1) for _ in range(days)],
+        }}
+    return {"current": {
+        "temperature_2m": round(rng.uniform(18, 40), 1),
+        "relative_humidity_2m": rng.randint(20, 90),
+        "wind_speed_10m": round(rng.uniform(1, 20), 1),
+        "weather_code": rng.choice([0, 1, 2, 3, 45, 61]),
+    }}
+
+
+@app.get("/v1/air-quality")
+async def open_meteo_air_quality(request: Request):
+    error = await _simulate("air_quality")
+    if error:
+        return error
+    rng = _site_rng(request, "air_quality")
+    if "hourly" in request.query_params:
+        hours = int(request.query_params.get("forecast_days", 7)) * 24
+        start = date.today()
+        return {"hourly": {
+            "time": [f"{start + timedelta(days=h // 24)}T{h % 24:02d}:00" for h in range(hours)],
+            "pm2_5": [round(rng.uniform(10, 120), 1) for _ in range(hours)],
+            "pm10": [round(rng.uniform(20, 250), 1) for _ in range(hours)],
+            "us_aqi": [rng.randint(30, 250) for _ in range(hours)],
+        }}
+    return {"current": {
+        "pm2_5": round(rng.uniform(10, 120), 1),
+        "pm10": round(rng.uniform(20, 250), 1),
+        "us_aqi": rng.randint(30, 250),
+    }}
+
+
+@app.get("/api/temporal/monthly/point")
+async def nasa_power_monthly(request: Request):
+    error = await _simulate("nasa_power")
+    if error:
+        return error
+    rng = _site_rng(request, "nasa_power")
+    lat = abs(float(request.query_params.get("latitude", 0)))
+    start = int(request.query_params.get("start", 2020))
+    end = int(request.query_params.get("end", 2023))
+    ghi, t2m = {}, {}
+    for year in range(start, end + 1):
+        for month in range(1, 14):  # month 13 is POWER's annual value
+            season = 1 - 0.25 * abs(6.5 - min(month, 12)) / 5.5
+            ghi[f"{year}{month:02d}"] = round(max(1.0, (6.5 - lat * 0.04) * season + rng.uniform(-0.3, 0.3)), 2)
+            t2m[f"{year}{month:02d}"] = round(28 - lat * 0.3 + 8 * season - 4 + rng.uniform(-1, 1), 2)
+    return {"properties": {"parameter": {"ALLSKY_SFC_SW_DWN": ghi, "T2M": t2m}}}
+
+
+@app.get("/data/2.5/weather")
+async def openweathermap_current(request: Request):
+    error = await _simulate("openweathermap")
+    if error:
+        return error
+    rng = _site_rng(request, "openweathermap")
+    return {
+        "main": {"temp": round(rng.uniform(18, 40), 1), "humidity": rng.randint(20, 90)},
+        "wind": {"speed": round(rng.uniform(1, 12), 1)},
+        "weather": [{"description": rng.choice(["clear sky", "haze", "few clouds"])}],
+    }
+
+
+@app.post("/_stub/config")
+async def update_config(request: Request):
+    """Change latency/fault settings on a running stub (camelCase keys as in GET)"""
+    changes = await request.json()
+    unknown = sorted(set(changes) - set(_config))
+    if unknown:
+        return JSONResponse({"error": f"unknown keys: {', '.join(unknown)}"}, status_code=422)
+    _config.update({k: float(v) for k, v in changes.items()})
+    _config["errorStatus"] = int(_config["errorStatus"])
+    return _config
+
+
+@app.get("/_stub/config")
+async def get_config():
+    return _config
+
+
+@app.get("/_stub/stats")
+async def get_stats():
+    return dict(sorted(_stats.items()))
+
+
+async def serve(host: str, port: int):
+    import uvicorn
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host=host, port=port + offset, log_level="warning"))
+        for _, _, offset in UPSTREAMS
+    ]
+    # One app on several ports; only the first server installs signal handlers
+    for server in servers[1:]:
+        server.install_signal_handlers = lambda: None
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100, help="first of four consecutive ports")
+    parser.add_argument("--latency-ms", type=float, default=_config["latencyMs"])
+    parser.add_argument("--jitter-ms", type=float, default=_config["jitterMs"])
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of requests that stall")
+    parser.add_argument("--stall-ms", type=float, default=_config["stallMs"])
+    args = parser.parse_args(argv)
+
+    _config.update(latencyMs=args.latency_ms, jitterMs=args.jitter_ms, errorRate=args.error_rate,
+                   errorStatus=args.error_status, timeoutRate=args.timeout_rate, stallMs=args.stall_ms)
+    print("Point the AI service at the stub with:")
+    for setting, path, offset in UPSTREAMS:
+        print(f"  {setting}=http://{args.host}:{args.port + offset}{path}")
+    asyncio.run(serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
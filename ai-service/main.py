@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
 import os
 from dotenv import load_dotenv
@@ -8,16 +9,28 @@ load_dotenv()
 
 from routers import roof_analysis, panel_placement, dust_monitoring, rate_prediction
 from services.model_loader import load_all_models
+from services.http_client import start_http_clients, close_http_clients
+from services.irradiance_store import close_irradiance_store
+from services.image_pool import shutdown_image_pool
+from services.roof_cache import close_roof_cache
+from services.metrics import MetricsMiddleware, render_metrics
+from services.tracing import TracingMiddleware, close_span_exporter
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load ML models on startup"""
+    """Load ML models and open shared HTTP client pools on startup"""
     print("[AI] Loading ML models...")
     load_all_models()
     print("[AI] All models loaded successfully")
+    app.state.http = start_http_clients()
     yield
     print("[AI] Shutting down AI service")
+    await close_http_clients()
+    close_irradiance_store()
+    shutdown_image_pool()
+    await close_roof_cache()
+    close_span_exporter()
 
 
 app = FastAPI(
@@ -37,6 +50,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency and in-flight metrics, exported at /metrics
+app.add_middleware(MetricsMiddleware)
+# Server-Timing stage breakdown (TRACING_ENABLED)
+app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(roof_analysis.router, prefix="/ai", tags=["Roof Analysis"])
 app.include_router(panel_placement.router, prefix="/ai", tags=["Panel Placement"])
@@ -51,3 +69,9 @@ async def health_check():
         "service": "smartsolar-ai",
         "version": "1.0.0",
     }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of service metrics"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
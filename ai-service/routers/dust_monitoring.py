@@ -1,101 +1,137 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 import asyncio
+import json
 import numpy as np
-import httpx
 import time
 from datetime import datetime, timedelta
-from schemas.models import DustPredictionRequest, CleaningScheduleRequest
+from pydantic import ValidationError
+from schemas.models import DustPredictionRequest, DustBatchRequest, DustBatchSite, CleaningScheduleRequest
 from config import get_settings
+from services.http_client import get_http_client
+from services.metrics import FALLBACK_ESTIMATES
+from services.cache import TTLCache, tile_key, tile_center
+from services.singleflight import SingleFlight
+from services.tracing import span
 
 router = APIRouter()
 
+# Live current-conditions results, shared by every site in the same tile.
+# Entries expire on Open-Meteo's update boundary rather than per insert.
+_weather_cache = TTLCache(
+    maxsize=get_settings().WEATHER_CACHE_MAX_ENTRIES,
+    ttl=get_settings().WEATHER_CACHE_TTL,
+    align_ttl=True,
+)
+# Concurrent upstream fetches for the same (tile, parameter set) share one request
+_inflight = SingleFlight()
+
 
 async def fetch_weather_data(lat: float, lng: float) -> dict:
     """
     Fetch REAL weather + air quality data using Open-Meteo (free, no API key).
     Falls back to location-aware estimates only if the API is unreachable.
+    Live results are cached per WEATHER_TILE_DEG tile; estimates are not.
     """
+    settings = get_settings()
+    tile = tile_key(lat, lng, settings.WEATHER_TILE_DEG)
+    cached = _weather_cache.get(tile)
+    if cached is not None:
+        return dict(cached)
+    return dict(await _inflight.do(("current", tile), _fetch_weather_data, tile))
+
+
+async def _fetch_weather_data(tile: tuple) -> dict:
+    settings = get_settings()
+    # Query the tile centre so every site in the tile gets the same answer
+    lat, lng = tile_center(tile, settings.WEATHER_TILE_DEG)
     weather = None
     aqi_data = None
 
     # ---- Open-Meteo Weather API (free, no key) ----
     try:
-        async with httpx.AsyncClient(timeout=8) as client:
-            resp = await client.get(
-                "https://api.open-meteo.com/v1/forecast",
+        with span("fetch_weather"):
+            resp = await get_http_client().get(
+                settings.OPEN_METEO_FORECAST_URL,
+                provider="open_meteo_weather",
                 params={
                     "latitude": lat,
                     "longitude": lng,
                     "current": "temperature_2m,relative_humidity_2m,wind_speed_10m,weather_code",
                     "timezone": "auto",
                 },
+                timeout=settings.OPEN_METEO_TIMEOUT,
             )
-            if resp.status_code == 200:
-                data = resp.json().get("current", {})
-                wmo_code = data.get("weather_code", 0)
-                # WMO weather code to description
-                wmo_map = {
-                    0: "clear sky", 1: "mainly clear", 2: "partly cloudy", 3: "overcast",
-                    45: "fog", 48: "rime fog", 51: "light drizzle", 53: "moderate drizzle",
-                    55: "dense drizzle", 61: "slight rain", 63: "moderate rain", 65: "heavy rain",
-                    71: "slight snow", 73: "moderate snow", 80: "slight rain showers",
-                    95: "thunderstorm", 96: "thunderstorm with hail",
-                }
-                weather = {
-                    "temperature": round(data.get("temperature_2m", 30), 1),
-                    "humidity": round(data.get("relative_humidity_2m", 50), 1),
-                    "windSpeed": round(data.get("wind_speed_10m", 5), 1),
-                    "description": wmo_map.get(wmo_code, "unknown"),
-                    "source": "Open-Meteo",
-                }
+        if resp.status_code == 200:
+            data = resp.json().get("current", {})
+            wmo_code = data.get("weather_code", 0)
+            # WMO weather code to description
+            wmo_map = {
+                0: "clear sky", 1: "mainly clear", 2: "partly cloudy", 3: "overcast",
+                45: "fog", 48: "rime fog", 51: "light drizzle", 53: "moderate drizzle",
+                55: "dense drizzle", 61: "slight rain", 63: "moderate rain", 65: "heavy rain",
+                71: "slight snow", 73: "moderate snow", 80: "slight rain showers",
+                95: "thunderstorm", 96: "thunderstorm with hail",
+            }
+            weather = {
+                "temperature": round(data.get("temperature_2m", 30), 1),
+                "humidity": round(data.get("relative_humidity_2m", 50), 1),
+                "windSpeed": round(data.get("wind_speed_10m", 5), 1),
+                "description": wmo_map.get(wmo_code, "unknown"),
+                "source": "Open-Meteo",
+            }
     except Exception as e:
         print(f"Open-Meteo weather error: {e}")
 
     # ---- Open-Meteo Air Quality API (free, no key) ----
     try:
-        async with httpx.AsyncClient(timeout=8) as client:
-            resp = await client.get(
-                "https://air-quality-api.open-meteo.com/v1/air-quality",
+        with span("fetch_aqi"):
+            resp = await get_http_client().get(
+                settings.OPEN_METEO_AIR_QUALITY_URL,
+                provider="open_meteo_aqi",
                 params={
                     "latitude": lat,
                     "longitude": lng,
                     "current": "pm2_5,pm10,us_aqi",
                 },
+                timeout=settings.OPEN_METEO_TIMEOUT,
             )
-            if resp.status_code == 200:
-                data = resp.json().get("current", {})
-                aqi_data = {
-                    "aqi": int(data.get("us_aqi", 50)),
-                    "pm25": round(data.get("pm2_5", 25), 1),
-                    "pm10": round(data.get("pm10", 50), 1),
-                    "source": "Open-Meteo AQI",
-                }
+        if resp.status_code == 200:
+            data = resp.json().get("current", {})
+            aqi_data = {
+                "aqi": int(data.get("us_aqi", 50)),
+                "pm25": round(data.get("pm2_5", 25), 1),
+                "pm10": round(data.get("pm10", 50), 1),
+                "source": "Open-Meteo AQI",
+            }
     except Exception as e:
         print(f"Open-Meteo AQI error: {e}")
 
     # ---- Also try OpenWeatherMap if key is configured ----
-    settings = get_settings()
     if not weather and settings.OPENWEATHER_API_KEY:
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
-                resp = await client.get(
-                    "https://api.openweathermap.org/data/2.5/weather",
+            with span("fetch_weather"):
+                resp = await get_http_client().get(
+                    settings.OPENWEATHER_API_URL,
+                    provider="openweathermap",
                     params={"lat": lat, "lon": lng, "appid": settings.OPENWEATHER_API_KEY, "units": "metric"},
+                    timeout=settings.OPENWEATHER_TIMEOUT,
                 )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    weather = {
-                        "temperature": data["main"]["temp"],
-                        "humidity": data["main"]["humidity"],
-                        "windSpeed": data["wind"]["speed"],
-                        "description": data["weather"][0]["description"],
-                        "source": "OpenWeatherMap",
-                    }
+            if resp.status_code == 200:
+                data = resp.json()
+                weather = {
+                    "temperature": data["main"]["temp"],
+                    "humidity": data["main"]["humidity"],
+                    "windSpeed": data["wind"]["speed"],
+                    "description": data["weather"][0]["description"],
+                    "source": "OpenWeatherMap",
+                }
         except Exception:
             pass
 
     # ---- Fallback: location-aware estimates (changes each call) ----
     if not weather:
+        FALLBACK_ESTIMATES.inc(source="weather")
         rng = np.random.RandomState(int(time.time()) % (2**31))
         # Use latitude to estimate realistic temperature
         abs_lat = abs(lat)
@@ -116,6 +152,7 @@ async def fetch_weather_data(lat: float, lng: float) -> dict:
         }
 
     if not aqi_data:
+        FALLBACK_ESTIMATES.inc(source="aqi")
         rng = np.random.RandomState(int(time.time() * 7) % (2**31))
         # Urban areas near equator tend to have worse AQI
         base_aqi = 60 if abs(lat) > 35 else 90
@@ -126,15 +163,26 @@ async def fetch_weather_data(lat: float, lng: float) -> dict:
             "source": "estimated",
         }
 
-    return {**weather, **aqi_data}
+    result = {**weather, **aqi_data}
+    if weather["source"] != "estimated" and aqi_data["source"] != "estimated":
+        _weather_cache.set(tile, result)
+    return result
 
 
 async def fetch_weather_forecast(lat: float, lng: float, days: int = 7) -> list:
-    """Fetch real 7-day weather forecast from Open-Meteo."""
+    """Fetch real 7-day weather forecast from Open-Meteo (one upstream call per tile at a time)."""
+    res = get_settings().WEATHER_TILE_DEG
+    tile = tile_key(lat, lng, res)
+    return await _inflight.do(("forecast", tile, days), _fetch_weather_forecast, *tile_center(tile, res), days)
+
+
+async def _fetch_weather_forecast(lat: float, lng: float, days: int) -> list:
+    settings = get_settings()
     try:
-        async with httpx.AsyncClient(timeout=8) as client:
-            resp = await client.get(
-                "https://api.open-meteo.com/v1/forecast",
+        with span("fetch_weather_forecast"):
+            resp = await get_http_client().get(
+                settings.OPEN_METEO_FORECAST_URL,
+                provider="open_meteo_weather",
                 params={
                     "latitude": lat,
                     "longitude": lng,
@@ -142,29 +190,31 @@ async def fetch_weather_forecast(lat: float, lng: float, days: int = 7) -> list:
                     "timezone": "auto",
                     "forecast_days": days,
                 },
+                timeout=settings.OPEN_METEO_TIMEOUT,
             )
-            if resp.status_code == 200:
-                data = resp.json().get("daily", {})
-                dates = data.get("time", [])
-                temps_max = data.get("temperature_2m_max", [])
-                temps_min = data.get("temperature_2m_min", [])
-                rain_prob = data.get("precipitation_probability_max", [])
-                wind_max = data.get("wind_speed_10m_max", [])
-
-                forecast = []
-                for i in range(min(days, len(dates))):
-                    forecast.append({
-                        "date": dates[i],
-                        "tempMax": temps_max[i] if i < len(temps_max) else 35,
-                        "tempMin": temps_min[i] if i < len(temps_min) else 20,
-                        "rainProbability": rain_prob[i] if i < len(rain_prob) else 0,
-                        "windMax": wind_max[i] if i < len(wind_max) else 10,
-                    })
-                return forecast
+        if resp.status_code == 200:
+            data = resp.json().get("daily", {})
+            dates = data.get("time", [])
+            temps_max = data.get("temperature_2m_max", [])
+            temps_min = data.get("temperature_2m_min", [])
+            rain_prob = data.get("precipitation_probability_max", [])
+            wind_max = data.get("wind_speed_10m_max", [])
+
+            forecast = []
+            for i in range(min(days, len(dates))):
+                forecast.append({
+                    "date": dates[i],
+                    "tempMax": temps_max[i] if i < len(temps_max) else 35,
+                    "tempMin": temps_min[i] if i < len(temps_min) else 20,
+                    "rainProbability": rain_prob[i] if i < len(rain_prob) else 0,
+                    "windMax": wind_max[i] if i < len(wind_max) else 10,
+                })
+            return forecast
     except Exception as e:
         print(f"Open-Meteo forecast error: {e}")
 
     # Fallback
+    FALLBACK_ESTIMATES.inc(source="weather_forecast")
     rng = np.random.RandomState(int(time.time() / 3600) % (2**31))
     return [
         {
@@ -179,50 +229,60 @@ async def fetch_weather_forecast(lat: float, lng: float, days: int = 7) -> list:
 
 
 async def fetch_aqi_forecast(lat: float, lng: float, days: int = 7) -> list:
-    """Fetch real air quality forecast from Open-Meteo."""
+    """Fetch real air quality forecast from Open-Meteo (one upstream call per tile at a time)."""
+    res = get_settings().WEATHER_TILE_DEG
+    tile = tile_key(lat, lng, res)
+    return await _inflight.do(("aqi_forecast", tile, days), _fetch_aqi_forecast, *tile_center(tile, res), days)
+
+
+async def _fetch_aqi_forecast(lat: float, lng: float, days: int) -> list:
+    settings = get_settings()
     try:
-        async with httpx.AsyncClient(timeout=8) as client:
-            resp = await client.get(
-                "https://air-quality-api.open-meteo.com/v1/air-quality",
+        with span("fetch_aqi_forecast"):
+            resp = await get_http_client().get(
+                settings.OPEN_METEO_AIR_QUALITY_URL,
+                provider="open_meteo_aqi",
                 params={
                     "latitude": lat,
                     "longitude": lng,
                     "hourly": "pm2_5,pm10,us_aqi",
                     "forecast_days": days,
                 },
+                timeout=settings.OPEN_METEO_TIMEOUT,
             )
-            if resp.status_code == 200:
-                data = resp.json().get("hourly", {})
-                times = data.get("time", [])
-                pm25_vals = data.get("pm2_5", [])
-                pm10_vals = data.get("pm10", [])
-                aqi_vals = data.get("us_aqi", [])
-
-                # Aggregate hourly to daily averages
-                daily = {}
-                for i, t in enumerate(times):
-                    day = t[:10]
-                    if day not in daily:
-                        daily[day] = {"pm25": [], "pm10": [], "aqi": []}
-                    if i < len(pm25_vals) and pm25_vals[i] is not None:
-                        daily[day]["pm25"].append(pm25_vals[i])
-                    if i < len(pm10_vals) and pm10_vals[i] is not None:
-                        daily[day]["pm10"].append(pm10_vals[i])
-                    if i < len(aqi_vals) and aqi_vals[i] is not None:
-                        daily[day]["aqi"].append(aqi_vals[i])
-
-                result = []
-                for day_str, vals in list(daily.items())[:days]:
-                    result.append({
-                        "date": day_str,
-                        "pm25": round(np.mean(vals["pm25"]), 1) if vals["pm25"] else 30,
-                        "pm10": round(np.mean(vals["pm10"]), 1) if vals["pm10"] else 60,
-                        "aqi": int(np.mean(vals["aqi"])) if vals["aqi"] else 80,
-                    })
-                return result
+        if resp.status_code == 200:
+            data = resp.json().get("hourly", {})
+            times = data.get("time", [])
+            pm25_vals = data.get("pm2_5", [])
+            pm10_vals = data.get("pm10", [])
+            aqi_vals = data.get("us_aqi", [])
+
+            # Aggregate hourly to daily averages
+            daily = {}
+            for i, t in enumerate(times):
+                day = t[:10]
+                if day not in daily:
+                    daily[day] = {"pm25": [], "pm10": [], "aqi": []}
+                if i < len(pm25_vals) and pm25_vals[i] is not None:
+                    daily[day]["pm25"].append(pm25_vals[i])
+                if i < len(pm10_vals) and pm10_vals[i] is not None:
+                    daily[day]["pm10"].append(pm10_vals[i])
+                if i < len(aqi_vals) and aqi_vals[i] is not None:
+                    daily[day]["aqi"].append(aqi_vals[i])
+
+            result = []
+            for day_str, vals in list(daily.items())[:days]:
+                result.append({
+                    "date": day_str,
+                    "pm25": round(np.mean(vals["pm25"]), 1) if vals["pm25"] else 30,
+                    "pm10": round(np.mean(vals["pm10"]), 1) if vals["pm10"] else 60,
+                    "aqi": int(np.mean(vals["aqi"])) if vals["aqi"] else 80,
+                })
+            return result
     except Exception as e:
         print(f"Open-Meteo AQI forecast error: {e}")
 
+    FALLBACK_ESTIMATES.inc(source="aqi_forecast")
     return []
 
 
@@ -282,22 +342,37 @@ def get_region_type(lat: float, lng: float) -> int:
 
 # Base daily soiling rate (% efficiency loss per day) by region
 _BASE_SOILING_RATE = {0: 0.15, 1: 0.10, 2: 0.35}  # urban, rural, desert
-
-def calculate_soiling(
-    days_since_cleaning: int,
-    pm10: float,
-    pm25: float,
-    aqi: int,
-    humidity: float,
-    wind_speed: float,
-    temperature: float,
-    region_type: int,
-    season: int,
+# Season multipliers: winter, spring, summer, monsoon
+_SEASON_FACTOR = {0: 1.1, 1: 1.2, 2: 1.0, 3: 0.5}
+_BASE_SOILING_TABLE = np.array([_BASE_SOILING_RATE[i] for i in range(3)])
+_SEASON_FACTOR_TABLE = np.array([_SEASON_FACTOR[i] for i in range(4)])
+
+
+def _lookup(table: np.ndarray, idx: np.ndarray, default: float) -> np.ndarray:
+    """Vectorized dict.get over small integer codes"""
+    idx = np.asarray(idx, dtype=np.int64)
+    valid = (idx >= 0) & (idx < len(table))
+    return np.where(valid, table[np.clip(idx, 0, len(table) - 1)], default)
+
+
+def calculate_soiling_array(
+    days_since_cleaning,
+    pm10,
+    pm25,
+    aqi,
+    humidity,
+    wind_speed,
+    temperature,
+    region_type,
+    season,
 ) -> dict:
     """
-    Physics-based PV panel soiling model.
+    Vectorized physics-based PV panel soiling model.
 
-    Returns dust_level (0-100), efficiency_loss (%), and cleaning_urgency (0-100).
+    Every argument may be a scalar or a NumPy array (broadcast together), so a whole
+    fleet or a long forecast horizon is evaluated in one call. Returns arrays of
+    efficiency_loss (%), dust_level (0-100), cleaning_urgency (0-100),
+    daily_soiling_rate and the individual factors.
 
     The model:
       1. Starts with a region-specific base daily soiling rate.
@@ -307,98 +382,188 @@ def calculate_soiling(
       5. Monsoon/rainy season reduces soiling.
       6. Soiling is NOT linear — it follows a saturating curve (diminishing returns).
     """
-    base_rate = _BASE_SOILING_RATE.get(region_type, 0.15)
+    days = np.asarray(days_since_cleaning, dtype=np.float64)
+    pm10 = np.asarray(pm10, dtype=np.float64)
+    aqi = np.asarray(aqi, dtype=np.float64)
+    humidity = np.asarray(humidity, dtype=np.float64)
+    wind_speed = np.asarray(wind_speed, dtype=np.float64)
+
+    base_rate = _lookup(_BASE_SOILING_TABLE, region_type, 0.15)
 
     # --- PM10 factor: main driver of soiling on PV panels ---
     # Normal PM10 ~30-50 µg/m³, dusty ~100-200, sandstorm 300+
     # Factor: PM10/50 normalized so PM10=50 gives 1x, PM10=200 gives 4x
-    pm10_factor = max(0.3, pm10 / 50.0)
+    pm10_factor = np.maximum(0.3, pm10 / 50.0)
 
     # --- AQI factor: additional pollution indicator ---
     # AQI 50 = good (1x), AQI 150 = unhealthy (1.3x), AQI 300 = hazardous (1.6x)
-    aqi_factor = 1.0 + max(0, (aqi - 50)) / 500.0
+    aqi_factor = 1.0 + np.maximum(0, aqi - 50) / 500.0
 
     # --- Humidity factor ---
     # Low humidity (<40%): dust stays loose, wind can clean → 0.9x
     # Moderate (40-70%): neutral → 1.0x
     # High (>70%): cementation effect, dust sticks → up to 1.4x
-    if humidity < 40:
-        humidity_factor = 0.9
-    elif humidity > 70:
-        humidity_factor = 1.0 + (humidity - 70) / 75.0  # max ~1.4 at 100%
-    else:
-        humidity_factor = 1.0
+    humidity_factor = np.select(
+        [humidity < 40, humidity > 70],
+        [0.9, 1.0 + (humidity - 70) / 75.0],  # max ~1.4 at 100%
+        1.0,
+    )
 
     # --- Wind factor ---
     # Light wind (<5 km/h): no effect → 1.0x
     # Moderate wind (5-15 km/h): carries dust TO panels → up to 1.15x
     # Strong wind (>20 km/h): self-cleaning effect → 0.7-0.85x
-    if wind_speed > 20:
-        wind_factor = max(0.7, 1.0 - (wind_speed - 20) / 60.0)
-    elif wind_speed > 5:
-        wind_factor = 1.0 + (wind_speed - 5) / 100.0
-    else:
-        wind_factor = 1.0
+    wind_factor = np.select(
+        [wind_speed > 20, wind_speed > 5],
+        [np.maximum(0.7, 1.0 - (wind_speed - 20) / 60.0), 1.0 + (wind_speed - 5) / 100.0],
+        1.0,
+    )
 
     # --- Season factor ---
     # Monsoon (3): rain washes panels → 0.5x
     # Winter (0): generally drier in subtropics → 1.1x
     # Spring (1): dust storms in some regions → 1.2x
-    season_factors = {0: 1.1, 1: 1.2, 2: 1.0, 3: 0.5}
-    season_factor = season_factors.get(season, 1.0)
+    season_factor = _lookup(_SEASON_FACTOR_TABLE, season, 1.0)
 
     # --- Effective daily soiling rate ---
     daily_rate = base_rate * pm10_factor * aqi_factor * humidity_factor * wind_factor * season_factor
     # Clamp to realistic bounds: 0.02% to 2.5% per day
-    daily_rate = max(0.02, min(2.5, daily_rate))
+    daily_rate = np.clip(daily_rate, 0.02, 2.5)
 
     # --- Soiling follows a saturating curve (not linear) ---
     # Reason: as dust accumulates, less additional dust sticks.
     # Model: efficiency_loss = max_loss * (1 - e^(-rate * days / max_loss))
     # max_loss caps at ~40% (heavily soiled panels in extreme conditions)
     max_loss = 40.0
-    efficiency_loss = max_loss * (1.0 - np.exp(-daily_rate * days_since_cleaning / max_loss))
-    efficiency_loss = round(max(0, min(max_loss, efficiency_loss)), 1)
+    efficiency_loss = max_loss * (1.0 - np.exp(-daily_rate * days / max_loss))
+    efficiency_loss = np.round(np.clip(efficiency_loss, 0, max_loss), 1)
 
     # --- Dust level (0-100) ---
     # Normalized dust accumulation: combines PM exposure + time
     # Represents how "dusty" the panel surface is
-    dust_level = round(min(100, efficiency_loss * 2.5), 1)
+    dust_level = np.round(np.minimum(100, efficiency_loss * 2.5), 1)
 
     # --- Cleaning urgency (0-100) ---
     # Based on economic impact: higher loss + more days = more urgent
     # Urgency rises steeply after 5% loss (economically significant)
-    if efficiency_loss > 15:
-        urgency = min(100, 70 + efficiency_loss)
-    elif efficiency_loss > 8:
-        urgency = min(100, 40 + efficiency_loss * 2)
-    elif efficiency_loss > 3:
-        urgency = min(100, 10 + efficiency_loss * 4)
-    else:
-        urgency = max(0, efficiency_loss * 3)
-    urgency = round(urgency, 1)
+    urgency = np.select(
+        [efficiency_loss > 15, efficiency_loss > 8, efficiency_loss > 3],
+        [
+            np.minimum(100, 70 + efficiency_loss),
+            np.minimum(100, 40 + efficiency_loss * 2),
+            np.minimum(100, 10 + efficiency_loss * 4),
+        ],
+        np.maximum(0, efficiency_loss * 3),
+    )
+    urgency = np.round(urgency, 1)
 
     return {
         "efficiency_loss": efficiency_loss,
         "dust_level": dust_level,
         "cleaning_urgency": urgency,
-        "daily_soiling_rate": round(daily_rate, 3),
+        "daily_soiling_rate": daily_rate,
         "factors": {
-            "base_rate": round(base_rate, 3),
-            "pm10_factor": round(pm10_factor, 2),
-            "aqi_factor": round(aqi_factor, 2),
-            "humidity_factor": round(humidity_factor, 2),
-            "wind_factor": round(wind_factor, 2),
-            "season_factor": round(season_factor, 2),
+            "base_rate": base_rate,
+            "pm10_factor": pm10_factor,
+            "aqi_factor": aqi_factor,
+            "humidity_factor": humidity_factor,
+            "wind_factor": wind_factor,
+            "season_factor": season_factor,
         },
     }
 
 
-@router.get("/dust/current/{lat}/{lng}")
-async def get_current_dust(lat: float, lng: float, days_since_cleaning: int = 15):
-    """Get current dust impact prediction using REAL weather data for this location."""
-    weather = await fetch_weather_data(lat, lng)
+def calculate_soiling(
+    days_since_cleaning: int,
+    pm10: float,
+    pm25: float,
+    aqi: int,
+    humidity: float,
+    wind_speed: float,
+    temperature: float,
+    region_type: int,
+    season: int,
+) -> dict:
+    """
+    Physics-based PV panel soiling model for a single site/day.
 
+    Returns dust_level (0-100), efficiency_loss (%), and cleaning_urgency (0-100).
+    Thin scalar wrapper around calculate_soiling_array.
+    """
+    with span("soiling"):
+        result = calculate_soiling_array(
+            days_since_cleaning, pm10, pm25, aqi, humidity, wind_speed, temperature, region_type, season,
+        )
+    factors = result["factors"]
+
+    return {
+        "efficiency_loss": float(result["efficiency_loss"]),
+        "dust_level": float(result["dust_level"]),
+        "cleaning_urgency": float(result["cleaning_urgency"]),
+        "daily_soiling_rate": round(float(result["daily_soiling_rate"]), 3),
+        "factors": {
+            "base_rate": round(float(factors["base_rate"]), 3),
+            "pm10_factor": round(float(factors["pm10_factor"]), 2),
+            "aqi_factor": round(float(factors["aqi_factor"]), 2),
+            "humidity_factor": round(float(factors["humidity_factor"]), 2),
+            "wind_factor": round(float(factors["wind_factor"]), 2),
+            "season_factor": round(float(factors["season_factor"]), 2),
+        },
+    }
+
+
+def forecast_soiling(weather_fc: list, aqi_fc: list, days_since_cleaning: int, region_type: int, season: int):
+    """
+    Soiling for every forecast day in one vectorized call.
+    Returns (per-day AQI dicts, rain-likely mask, calculate_soiling_array result).
+    """
+    aqi_by_date = {a["date"]: a for a in aqi_fc}
+    aqi_days = [aqi_by_date.get(wf["date"], {"pm25": 30, "pm10": 60, "aqi": 80}) for wf in weather_fc]
+
+    temp_max = np.array([wf["tempMax"] for wf in weather_fc], dtype=np.float64)
+    temp_min = np.array([wf["tempMin"] for wf in weather_fc], dtype=np.float64)
+    rain_prob = np.array([wf["rainProbability"] for wf in weather_fc], dtype=np.float64)
+    wind_max = np.array([wf["windMax"] for wf in weather_fc], dtype=np.float64)
+
+    # Estimate humidity from rain probability and temperature
+    humidity_est = np.clip(65 - (temp_max - 25) * 0.8 + rain_prob * 0.3, 25, 95)
+    rain_likely = rain_prob > 50
+
+    # If rain is likely, it partially washes panels — reduce effective dirty days
+    effective_days = days_since_cleaning + np.arange(len(weather_fc))
+    effective_days = np.where(rain_likely, np.maximum(1, (effective_days * 0.6).astype(np.int64)), effective_days)
+
+    with span("soiling"):
+        soiling = calculate_soiling_array(
+            days_since_cleaning=effective_days,
+            pm10=[a["pm10"] for a in aqi_days],
+            pm25=[a["pm25"] for a in aqi_days],
+            aqi=[a["aqi"] for a in aqi_days],
+            humidity=humidity_est,
+            wind_speed=wind_max * 0.6,  # average ≈ 60% of max
+            temperature=(temp_max + temp_min) / 2,
+            region_type=region_type,
+            season=season,
+        )
+    return aqi_days, rain_likely, soiling
+
+
+@router.get("/dust/cache/stats")
+async def get_weather_cache_stats():
+    """Hit/miss and coalescing counters for upstream weather fetches (for tuning WEATHER_TILE_DEG)"""
+    settings = get_settings()
+    return {
+        "success": True,
+        "data": {
+            "tileResolutionDeg": settings.WEATHER_TILE_DEG,
+            "weather": _weather_cache.stats(),
+            "upstreamRequests": _inflight.stats(),
+        },
+    }
+
+
+def assess_current_dust(lat: float, lng: float, days_since_cleaning: int, weather: dict) -> dict:
+    """Current dust impact for one site given its (possibly shared) weather snapshot."""
     season = get_season(lat)
     region_type = get_region_type(lat, lng)
 
@@ -420,22 +585,78 @@ async def get_current_dust(lat: float, lng: float, days_since_cleaning: int = 15
     is_estimated = weather_source == "estimated" or aqi_source == "estimated"
 
     return {
-        "success": True,
-        "data": {
-            "currentDustLevel": soiling["dust_level"],
-            "efficiencyLoss": soiling["efficiency_loss"],
-            "cleaningUrgency": soiling["cleaning_urgency"],
-            "dailySoilingRate": soiling["daily_soiling_rate"],
-            "soilingFactors": soiling["factors"],
-            "weather": weather,
-            "daysSinceClean": days_since_cleaning,
-            "season": ["winter", "spring", "summer", "monsoon"][season],
-            "regionType": ["urban", "rural", "desert"][region_type],
-            "dataSource": "estimated" if is_estimated else "live",
-        },
+        "currentDustLevel": soiling["dust_level"],
+        "efficiencyLoss": soiling["efficiency_loss"],
+        "cleaningUrgency": soiling["cleaning_urgency"],
+        "dailySoilingRate": soiling["daily_soiling_rate"],
+        "soilingFactors": soiling["factors"],
+        "weather": weather,
+        "daysSinceClean": days_since_cleaning,
+        "season": ["winter", "spring", "summer", "monsoon"][season],
+        "regionType": ["urban", "rural", "desert"][region_type],
+        "dataSource": "estimated" if is_estimated else "live",
     }
 
 
+@router.get("/dust/current/{lat}/{lng}")
+async def get_current_dust(lat: float, lng: float, days_since_cleaning: int = 15):
+    """Get current dust impact prediction using REAL weather data for this location."""
+    weather = await fetch_weather_data(lat, lng)
+    return {"success": True, "data": assess_current_dust(lat, lng, days_since_cleaning, weather)}
+
+
+@router.post("/dust/current/batch")
+async def get_current_dust_batch(request: DustBatchRequest):
+    """
+    Current dust impact for many sites in one call (used by the daily monitoring cron).
+    Sites are grouped by weather tile so each tile is fetched once, tiles are fetched
+    with bounded concurrency, and one NDJSON line is streamed per site as its tile completes.
+    Sites that fail validation (e.g. out-of-range coordinates) get an error line of their own.
+    """
+    settings = get_settings()
+    by_tile = {}
+    invalid = []
+    for raw in request.sites:
+        try:
+            site = DustBatchSite.model_validate(raw)
+        except ValidationError as e:
+            error = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            invalid.append({"siteId": raw.get("site_id"), "success": False, "error": error})
+            continue
+        by_tile.setdefault(tile_key(site.lat, site.lng, settings.WEATHER_TILE_DEG), []).append(site)
+
+    semaphore = asyncio.Semaphore(settings.DUST_BATCH_CONCURRENCY)
+
+    async def assess_tile(sites: list) -> list:
+        async with semaphore:
+            try:
+                weather = await fetch_weather_data(sites[0].lat, sites[0].lng)
+            except Exception as e:
+                return [{"siteId": site.site_id, "success": False, "error": str(e)} for site in sites]
+        results = []
+        for site in sites:
+            try:
+                data = assess_current_dust(site.lat, site.lng, site.days_since_cleaning, weather)
+                results.append({"siteId": site.site_id, "success": True, "data": data})
+            except Exception as e:
+                results.append({"siteId": site.site_id, "success": False, "error": str(e)})
+        return results
+
+    async def stream():
+        tasks = [asyncio.ensure_future(assess_tile(sites)) for sites in by_tile.values()]
+        try:
+            for result in invalid:
+                yield json.dumps(result) + "\n"
+            for done in asyncio.as_completed(tasks):
+                for result in await done:
+                    yield json.dumps(result) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.get("/dust/forecast/{lat}/{lng}")
 async def get_dust_forecast(lat: float, lng: float, days_since_cleaning: int = 15):
     """7-day dust forecast using real weather + AQI forecast data and physics-based soiling model."""
@@ -448,45 +669,21 @@ async def get_dust_forecast(lat: float, lng: float, days_since_cleaning: int = 1
         fetch_aqi_forecast(lat, lng, 7),
     )
 
-    aqi_by_date = {a["date"]: a for a in aqi_fc}
+    aqi_days, rain_likely, soiling = forecast_soiling(weather_fc, aqi_fc, days_since_cleaning, region_type, season)
 
     forecast = []
     for day_idx, wf in enumerate(weather_fc):
-        date_str = wf["date"]
-        aqi_day = aqi_by_date.get(date_str, {"pm25": 30, "pm10": 60, "aqi": 80})
-
-        avg_temp = (wf["tempMax"] + wf["tempMin"]) / 2
-        # Estimate humidity from rain probability and temperature
-        humidity_est = max(25, min(95, 65 - (wf["tempMax"] - 25) * 0.8 + wf["rainProbability"] * 0.3))
-        wind_est = wf["windMax"] * 0.6  # average ≈ 60% of max
-
-        effective_days = days_since_cleaning + day_idx
-        rain_likely = wf["rainProbability"] > 50
-
-        # If rain is likely, it partially washes panels — reduce effective dirty days
-        if rain_likely:
-            effective_days = max(1, int(effective_days * 0.6))
-
-        soiling = calculate_soiling(
-            days_since_cleaning=effective_days,
-            pm10=aqi_day["pm10"],
-            pm25=aqi_day["pm25"],
-            aqi=aqi_day["aqi"],
-            humidity=humidity_est,
-            wind_speed=wind_est,
-            temperature=avg_temp,
-            region_type=region_type,
-            season=season,
-        )
+        aqi_day = aqi_days[day_idx]
+        rain = bool(rain_likely[day_idx])
 
         # Good day to clean: no rain, moderate wind, reasonable AQI
-        is_good_day = (not rain_likely and wf["windMax"] < 25 and aqi_day["aqi"] < 120)
+        is_good_day = (not rain and wf["windMax"] < 25 and aqi_day["aqi"] < 120)
 
         forecast.append({
-            "date": date_str,
-            "dustLevel": soiling["dust_level"],
-            "efficiencyLoss": soiling["efficiency_loss"],
-            "rain": rain_likely,
+            "date": wf["date"],
+            "dustLevel": float(soiling["dust_level"][day_idx]),
+            "efficiencyLoss": float(soiling["efficiency_loss"][day_idx]),
+            "rain": rain,
             "rainProbability": wf["rainProbability"],
             "windMax": wf["windMax"],
             "tempMax": wf["tempMax"],
@@ -573,7 +770,7 @@ async def smart_cleaning_schedule(request: CleaningScheduleRequest):
     else:
         urgency = "low"
 
-    aqi_by_date = {a["date"]: a for a in aqi_fc}
+    aqi_days, rain_likely, day_soiling = forecast_soiling(weather_fc, aqi_fc, days, region_type, season)
 
     forecast_for_client = []
     best_clean_day = None
@@ -581,24 +778,10 @@ async def smart_cleaning_schedule(request: CleaningScheduleRequest):
 
     for day_idx, wf in enumerate(weather_fc):
         date_str = wf["date"]
-        aqi_day = aqi_by_date.get(date_str, {"pm25": 30, "pm10": 60, "aqi": 80})
-
-        rain_likely = wf["rainProbability"] > 50
-        effective_days = days + day_idx
-        if rain_likely:
-            effective_days = max(1, int(effective_days * 0.6))
-
-        avg_temp = (wf["tempMax"] + wf["tempMin"]) / 2
-        humidity_est = max(25, min(95, 65 - (wf["tempMax"] - 25) * 0.8 + wf["rainProbability"] * 0.3))
-
-        day_soiling = calculate_soiling(
-            days_since_cleaning=effective_days,
-            pm10=aqi_day["pm10"], pm25=aqi_day["pm25"], aqi=aqi_day["aqi"],
-            humidity=humidity_est, wind_speed=wf["windMax"] * 0.6,
-            temperature=avg_temp, region_type=region_type, season=season,
-        )
+        aqi_day = aqi_days[day_idx]
+        rain = bool(rain_likely[day_idx])
 
-        is_good_day = (not rain_likely and wf["windMax"] < 25 and aqi_day["aqi"] < 120)
+        is_good_day = (not rain and wf["windMax"] < 25 and aqi_day["aqi"] < 120)
 
         # Score for best cleaning day
         clean_score = (100 - wf["rainProbability"]) * 0.4 + (50 - min(wf["windMax"], 50)) * 0.3 + (200 - min(aqi_day["aqi"], 200)) * 0.3
@@ -608,9 +791,9 @@ async def smart_cleaning_schedule(request: CleaningScheduleRequest):
 
         forecast_for_client.append({
             "date": date_str,
-            "dustLevel": day_soiling["dust_level"],
-            "efficiencyLoss": day_soiling["efficiency_loss"],
-            "rain": rain_likely,
+            "dustLevel": float(day_soiling["dust_level"][day_idx]),
+            "efficiencyLoss": float(day_soiling["efficiency_loss"][day_idx]),
+            "rain": rain,
             "rainProbability": wf["rainProbability"],
             "windMax": wf["windMax"],
             "tempMax": wf["tempMax"],
@@ -1,23 +1,44 @@
-from fastapi import APIRouter
+import asyncio
+from fastapi import APIRouter, HTTPException
 import numpy as np
 import math
-import httpx
-from schemas.models import PanelPlacementRequest
+from schemas.models import PanelPlacementRequest, PanelSweepRequest
 from config import get_settings
+from services.http_client import get_http_client
+from services.irradiance_store import get_irradiance_store, grid_cell, summarize_power_monthly
+from services.metrics import FALLBACK_ESTIMATES
+from services.panel_packing import layout_payload, pack_panels, rectangle_polygon, scale_polygon
+from services.singleflight import SingleFlight
+from services.tracing import span
+from services.yield_model import hourly_yield, orientation_azimuth
 
 router = APIRouter()
 
+# Upper bound on wattage x tilt x spacing combinations per sweep
+MAX_SWEEP_SCENARIOS = 2000
+
+# Concurrent store misses for the same NASA POWER grid cell share one request
+_inflight = SingleFlight()
+
 
 async def fetch_solar_irradiance(lat: float, lng: float) -> dict:
-    """Fetch solar irradiance from NASA POWER API or use calculated values"""
-    settings = get_settings()
+    """Fetch solar irradiance from the local NASA POWER store, the API, or use calculated values"""
+    cached = get_irradiance_store().get(lat, lng)
+    # Rows written before monthly values were keyed by calendar month may be short; refetch those
+    if cached and len(cached.get("monthlyValues", ())) == 12:
+        return cached
+    return await _inflight.do(grid_cell(lat, lng), _fetch_solar_irradiance, lat, lng)
 
+
+async def _fetch_solar_irradiance(lat: float, lng: float) -> dict:
+    settings = get_settings()
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(
+        with span("fetch_irradiance"):
+            response = await get_http_client().get(
                 settings.NASA_POWER_API_URL,
+                provider="nasa_power",
                 params={
-                    "parameters": "ALLSKY_SFC_SW_DWN",
+                    "parameters": "ALLSKY_SFC_SW_DWN,T2M",
                     "community": "RE",
                     "longitude": lng,
                     "latitude": lat,
@@ -25,23 +46,20 @@ async def fetch_solar_irradiance(lat: float, lng: float) -> dict:
                     "end": 2023,
                     "format": "json",
                 },
+                timeout=settings.NASA_POWER_TIMEOUT,
             )
-            if response.status_code == 200:
-                data = response.json()
-                monthly = data.get("properties", {}).get("parameter", {}).get("ALLSKY_SFC_SW_DWN", {})
-                if monthly:
-                    values = [v for v in monthly.values() if isinstance(v, (int, float)) and v > 0]
-                    if values:
-                        return {
-                            "annualAverage": round(sum(values) / len(values), 2),
-                            "monthlyValues": [round(v, 2) for v in values[:12]],
-                            "peakSunHours": round(sum(values) / len(values) / 1, 2),
-                            "source": "NASA POWER API",
-                        }
+        if response.status_code == 200:
+            data = response.json()
+            parameters = data.get("properties", {}).get("parameter", {})
+            irradiance = summarize_power_monthly(parameters.get("ALLSKY_SFC_SW_DWN", {}), parameters.get("T2M"))
+            if irradiance:
+                get_irradiance_store().put(lat, lng, irradiance)
+                return irradiance
     except Exception:
         pass
 
     # Fallback: calculate based on latitude
+    FALLBACK_ESTIMATES.inc(source="irradiance")
     base_irradiance = 5.5  # kWh/m²/day global average
     lat_factor = 1.0 - abs(abs(lat) - 25) / 90  # Best at 25° latitude
     annual_avg = base_irradiance * max(0.5, lat_factor) * 1.1
@@ -68,33 +86,66 @@ def calculate_optimal_angles(lat: float):
     return round(optimal_tilt, 1), optimal_azimuth
 
 
+def inter_row_spacing(depth: float, tilt: float) -> float:
+    """Row gap (m) keeping a panel of sloped `depth` clear of the next row's shadow"""
+    shadow_length = depth * math.sin(math.radians(tilt)) / math.tan(math.radians(25))
+    return max(0.3, shadow_length * 0.5)
+
+
+# 25-year degradation: 0.5% of nameplate output lost per year
+DEGRADATION_YEARS = np.arange(1, 26)
+DEGRADATION_EFFICIENCY = 100 - DEGRADATION_YEARS * 0.5
+
+
+def estimate_production(lat: float, lng: float, tilt, azimuth: float, capacity_kw, irradiance: dict):
+    """
+    Daily production (kWh), total loss fraction and the hourly yield of the
+    first tilt. `tilt` and `capacity_kw` may be NumPy arrays, in which case
+    every scenario is evaluated at once (the hourly model runs once per
+    distinct tilt and is memoized).
+    """
+    tilt = np.atleast_1d(np.asarray(tilt, dtype=np.float64))
+    monthly_temp = irradiance.get("monthlyTemperature")
+    yields = {
+        t: hourly_yield(lat, lng, t, azimuth, irradiance["monthlyValues"], monthly_temp)
+        for t in np.unique(tilt).tolist()
+    }
+    annual_yield = np.array([yields[t]["annualYield"] for t in tilt.tolist()])
+    temp_loss = np.array([yields[t]["temperatureLoss"] for t in tilt.tolist()])
+
+    # Temperature, tilt and orientation are in the hourly model; the rest are system losses
+    inverter_loss = 0.04  # ~4% inverter loss
+    wiring_loss = 0.02  # ~2% wiring
+    soiling_loss = 0.02 + (0.03 if abs(lat) < 30 else 0.01)  # higher dust in tropics
+    system_losses = 1.0 - (inverter_loss + wiring_loss + soiling_loss)
+
+    daily_production = np.asarray(capacity_kw) * annual_yield * system_losses / 365
+    total_loss_fraction = 1 - system_losses * (1 - temp_loss)
+    return daily_production, total_loss_fraction, yields[tilt.tolist()[0]]
+
+
 def bin_pack_panels(usable_area: float, panel_width: float = 1.0, panel_height: float = 2.0,
-                     row_spacing: float = 0.3, col_spacing: float = 0.1):
-    """Bin-packing algorithm for panel layout on roof area"""
-    # Assume rectangular usable area
-    roof_width = math.sqrt(usable_area * 1.5)  # 3:2 aspect ratio
-    roof_height = usable_area / roof_width
-
-    effective_panel_w = panel_width + col_spacing
-    effective_panel_h = panel_height + row_spacing
-
-    cols = int(roof_width / effective_panel_w)
-    rows = int(roof_height / effective_panel_h)
-
-    layout = []
-    for r in range(rows):
-        for c in range(cols):
-            layout.append({
-                "row": r,
-                "col": c,
-                "x": round(c * effective_panel_w, 2),
-                "y": round(r * effective_panel_h, 2),
-                "width": panel_width,
-                "height": panel_height,
-                "orientation": "portrait",
-            })
-
-    return layout, cols, rows
+                     row_spacing: float = 0.3, col_spacing: float = 0.1, roof_polygon=None,
+                     obstructions=None, roof_area=None, landscape_row_spacing=None,
+                     layout_format: str = "objects"):
+    """
+    Pack panels on the roof. Without a polygon the usable area is taken as a
+    3:2 rectangle. Portrait and landscape grids are both tried when a
+    landscape row spacing is given. See layout_payload for layout_format.
+    """
+    if roof_polygon:
+        polygon = scale_polygon(roof_polygon, roof_area or usable_area)
+    else:
+        polygon = rectangle_polygon(usable_area)
+
+    spacing = {"portrait": row_spacing, "landscape": landscape_row_spacing}
+    orientations = ("portrait", "landscape") if landscape_row_spacing is not None else ("portrait",)
+    packed = pack_panels(polygon, obstructions, panel_width, panel_height, spacing, col_spacing, orientations)
+
+    layout = layout_payload(packed, layout_format)
+    cols = int(packed.col.max()) + 1 if packed.count else 0
+    rows = int(packed.row.max()) + 1 if packed.count else 0
+    return layout, cols, rows, packed
 
 
 @router.post("/panel-placement")
@@ -109,43 +160,49 @@ async def optimal_panel_placement(request: PanelPlacementRequest):
     panel_area = panel_width * panel_height
     panel_efficiency = 0.21  # 21% efficiency for modern panels
 
-    # Inter-row shading spacing
-    tilt_rad = math.radians(optimal_tilt)
-    shadow_length = panel_height * math.sin(tilt_rad) / math.tan(math.radians(25))
-    row_spacing = max(0.3, shadow_length * 0.5)
-
-    layout, cols, rows = bin_pack_panels(
-        request.usable_area, panel_width, panel_height, row_spacing
-    )
-    panel_count = len(layout)
+    # Inter-row shading spacing, from the panel's sloped depth in each orientation.
+    # Packing is CPU-bound, so it runs in a worker thread to keep the loop free.
+    try:
+        with span("pack_panels"):
+            layout, cols, rows, packed = await asyncio.to_thread(
+                bin_pack_panels,
+                request.usable_area, panel_width, panel_height, inter_row_spacing(panel_height, optimal_tilt),
+                roof_polygon=request.roof_polygon,
+                obstructions=[o.model_dump() for o in request.obstructions],
+                roof_area=request.roof_area,
+                landscape_row_spacing=inter_row_spacing(panel_width, optimal_tilt),
+                layout_format=request.layout_format,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    row_spacing = packed.row_spacing
+    panel_count = packed.count
     total_capacity = panel_count * request.panel_wattage / 1000  # kW
 
     # Energy production calculation
     peak_sun_hours = irradiance["peakSunHours"]
-
-    # System losses vary based on tilt mismatch, latitude (temperature), and orientation
-    inverter_loss = 0.04  # ~4% inverter loss
-    wiring_loss = 0.02  # ~2% wiring
-    soiling_loss = 0.02 + (0.03 if abs(request.lat) < 30 else 0.01)  # higher dust in tropics
-    temp_loss = 0.03 + max(0, (35 - abs(request.lat)) * 0.001)  # hotter regions lose more
-    tilt_mismatch = abs(request.roof_tilt - optimal_tilt) / max(optimal_tilt, 1) * 0.03
-    total_loss_fraction = min(0.30, inverter_loss + wiring_loss + soiling_loss + temp_loss + tilt_mismatch)
-    system_losses = 1.0 - total_loss_fraction
-    tilt_factor = 1.0 + 0.05 * (1 - abs(request.roof_tilt - optimal_tilt) / max(optimal_tilt, 1))
-
-    daily_production = total_capacity * peak_sun_hours * system_losses * min(tilt_factor, 1.1)
+    azimuth = orientation_azimuth(request.roof_orientation, optimal_azimuth)
+    with span("yield_model"):
+        daily_production, loss_fraction, yield_profile = estimate_production(
+            request.lat, request.lng, request.roof_tilt, azimuth, total_capacity, irradiance
+        )
+    daily_production = float(daily_production[0])
     annual_production = daily_production * 365
+    system_losses = 1.0 - float(loss_fraction[0])
+    monthly_production = [
+        round(v * annual_production / max(yield_profile["annualYield"], 1e-9), 0)
+        for v in yield_profile["monthlyYield"]
+    ]
 
     # 25-year degradation schedule
-    degradation = []
-    for year in range(1, 26):
-        year_efficiency = 100 - year * 0.5
-        year_production = annual_production * year_efficiency / 100
-        degradation.append({
+    degradation = [
+        {
             "year": year,
-            "efficiency": round(year_efficiency, 1),
-            "production": round(year_production, 0),
-        })
+            "efficiency": round(efficiency, 1),
+            "production": round(annual_production * efficiency / 100, 0),
+        }
+        for year, efficiency in zip(DEGRADATION_YEARS.tolist(), DEGRADATION_EFFICIENCY.tolist())
+    ]
 
     return {
         "success": True,
@@ -159,9 +216,13 @@ async def optimal_panel_placement(request: PanelPlacementRequest):
             "estimatedAnnualProduction": round(annual_production, 0),
             "estimatedDailyProduction": round(daily_production, 1),
             "peakSunHours": peak_sun_hours,
+            "planeOfArrayPeakSunHours": round(yield_profile["planeOfArrayPeakSunHours"], 2),
+            "actualAzimuth": azimuth,
+            "monthlyProduction": monthly_production,
             "systemLosses": round((1 - system_losses) * 100, 1),
             "layout": layout,
             "layoutDimensions": {"rows": rows, "cols": cols},
+            "panelOrientation": packed.orientation,
             "interRowSpacing": round(row_spacing, 2),
             "solarIrradiance": irradiance,
             "degradationSchedule": degradation,
@@ -169,6 +230,93 @@ async def optimal_panel_placement(request: PanelPlacementRequest):
     }
 
 
+@router.post("/panel-placement/sweep")
+async def panel_placement_sweep(request: PanelSweepRequest):
+    """Compare every combination of panel wattage, tilt and row spacing for one roof"""
+    tilts = request.tilts or None
+    spacings = request.row_spacings or [None]
+    if len(request.panel_wattages) * len(tilts or [0]) * len(spacings) > MAX_SWEEP_SCENARIOS:
+        raise HTTPException(status_code=422, detail=f"Sweep is limited to {MAX_SWEEP_SCENARIOS} scenarios")
+
+    irradiance = await fetch_solar_irradiance(request.lat, request.lng)
+    optimal_tilt, optimal_azimuth = calculate_optimal_angles(request.lat)
+    tilts = tilts or [optimal_tilt]
+    panel_width, panel_height = 1.0, 2.0
+    obstructions = [o.model_dump() for o in request.obstructions]
+
+    # Layout depends only on row spacing, so pack once per distinct spacing pair
+    pairs = [
+        (tilt, (spacing or inter_row_spacing(panel_height, tilt), spacing or inter_row_spacing(panel_width, tilt)))
+        for tilt in tilts for spacing in spacings
+    ]
+
+    def pack_all():
+        packed_by_spacing = {}
+        for _, pair in pairs:
+            if pair not in packed_by_spacing:
+                with span("pack_panels"):
+                    *_, packed_by_spacing[pair] = bin_pack_panels(
+                        request.usable_area, panel_width, panel_height, pair[0],
+                        roof_polygon=request.roof_polygon, obstructions=obstructions,
+                        roof_area=request.roof_area, landscape_row_spacing=pair[1],
+                    )
+        return packed_by_spacing
+
+    # Up to 50 packings; run them in a worker thread so the event loop stays responsive
+    try:
+        packed_by_spacing = await asyncio.to_thread(pack_all)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    geometry = [(tilt, packed_by_spacing[pair]) for tilt, pair in pairs]  # (tilt, packed) per combination
+
+    # One vectorized pass over wattage x geometry
+    wattage = np.repeat(np.asarray(request.panel_wattages, dtype=np.float64), len(geometry))
+    tilt = np.tile([g[0] for g in geometry], len(request.panel_wattages))
+    panel_count = np.tile([g[1].count for g in geometry], len(request.panel_wattages))
+    capacity = panel_count * wattage / 1000
+    azimuth = orientation_azimuth(request.roof_orientation, optimal_azimuth)
+    with span("yield_model"):
+        daily, loss_fraction, _ = estimate_production(request.lat, request.lng, tilt, azimuth, capacity, irradiance)
+    annual = daily * 365
+    lifetime = annual * DEGRADATION_EFFICIENCY.sum() / 100
+    specific_yield = np.divide(annual, capacity, out=np.zeros_like(annual), where=capacity > 0)
+
+    key = annual if request.rank_by == "annualProduction" else specific_yield
+    order = np.argsort(-key, kind="stable")[:request.top_n]
+
+    scenarios = []
+    for rank, i in enumerate(order.tolist(), start=1):
+        packed = geometry[i % len(geometry)][1]
+        scenarios.append({
+            "rank": rank,
+            "panelWattage": int(wattage[i]),
+            "tiltAngle": round(float(tilt[i]), 1),
+            "interRowSpacing": round(packed.row_spacing, 2),
+            "panelOrientation": packed.orientation,
+            "panelCount": int(panel_count[i]),
+            "totalCapacity": round(float(capacity[i]), 2),
+            "estimatedDailyProduction": round(float(daily[i]), 1),
+            "estimatedAnnualProduction": round(float(annual[i]), 0),
+            "specificYield": round(float(specific_yield[i]), 1),
+            "systemLosses": round(float(loss_fraction[i]) * 100, 1),
+            "lifetimeProduction": round(float(lifetime[i]), 0),
+            "year25Production": round(float(annual[i] * DEGRADATION_EFFICIENCY[-1] / 100), 0),
+        })
+
+    return {
+        "success": True,
+        "data": {
+            "scenarioCount": int(annual.size),
+            "rankedBy": request.rank_by,
+            "optimalTiltAngle": optimal_tilt,
+            "optimalAzimuth": optimal_azimuth,
+            "peakSunHours": irradiance["peakSunHours"],
+            "solarIrradiance": irradiance,
+            "scenarios": scenarios,
+        },
+    }
+
+
 @router.get("/solar-irradiance/{lat}/{lng}")
 async def get_solar_irradiance(lat: float, lng: float):
     """Get solar irradiance data for a specific location"""
@@ -1,54 +1,88 @@
 from fastapi import APIRouter
+from functools import lru_cache
 import numpy as np
-from services.model_loader import get_model
+from services.model_loader import get_model_version, get_model_with_version, get_registry
 from schemas.models import RatePredictionRequest
 
 router = APIRouter()
 
+CURRENT_YEAR = 2025
 
-@router.post("/rate-prediction")
-async def predict_electricity_rates(request: RatePredictionRequest):
-    """Predict electricity rate trends for the next N years"""
-    model = get_model("rate_predictor")
-    current_year = 2025
-
-    predictions = []
-    for year_offset in range(request.years_to_predict + 1):
-        year = current_year + year_offset
-        if model:
-            predicted_rate = float(model.predict(np.array([[year]]))[0])
-        else:
-            # Fallback: 3% annual increase
-            predicted_rate = request.current_rate * (1 + 0.03) ** year_offset
-
-        # Add seasonal variation
-        monthly_rates = []
-        for month in range(12):
-            seasonal_factor = 1.0 + 0.05 * np.sin(2 * np.pi * month / 12)
-            monthly_rates.append(round(predicted_rate * seasonal_factor, 2))
-
-        predictions.append({
-            "year": year,
-            "averageRate": round(predicted_rate, 2),
-            "monthlyRates": monthly_rates,
-            "yoyChange": round((predicted_rate / (request.current_rate if year_offset == 0 else predictions[-2]["averageRate"]) - 1) * 100, 2) if year_offset > 0 else 0,
-        })
+# Month-of-year multiplier applied to each predicted annual rate
+_SEASONAL_FACTORS = 1.0 + 0.05 * np.sin(2 * np.pi * np.arange(12) / 12)
+
+
+class ModelChangedError(Exception):
+    """The model was reloaded after the caller read its version"""
+
+    def __init__(self, version):
+        super().__init__(version)
+        self.version = version
+
+
+@lru_cache(maxsize=1024)
+def forecast_rates(region: str, current_rate: float, years_to_predict: int, model_version) -> dict:
+    """
+    Rate forecast for every year in one batched model call. Memoized per
+    (region, rate, horizon, model version), so a reloaded model is never
+    served stale results; the model itself is looked up here so the cache
+    does not keep old models alive. Raises ModelChangedError when the model
+    no longer matches model_version (nothing is cached then). The returned
+    dict is shared; do not mutate it.
+    """
+    model, version = get_model_with_version("rate_predictor", region)
+    if version != model_version:
+        raise ModelChangedError(version)
+    offsets = np.arange(years_to_predict + 1)
+    years = CURRENT_YEAR + offsets
+
+    if model:
+        rates = np.asarray(model.predict(years.reshape(-1, 1)), dtype=np.float64)
+    else:
+        # Fallback: 3% annual increase
+        rates = current_rate * 1.03 ** offsets
+
+    # Seasonal variation
+    monthly = np.round(rates[:, None] * _SEASONAL_FACTORS, 2)
+    yoy = np.zeros_like(rates)
+    yoy[1:] = (rates[1:] / rates[:-1] - 1) * 100
+
+    predictions = [
+        {"year": year, "averageRate": round(rate, 2), "monthlyRates": months, "yoyChange": round(change, 2)}
+        for year, rate, months, change in zip(years.tolist(), rates.tolist(), monthly.tolist(), yoy.tolist())
+    ]
 
     # Calculate cumulative impact
     total_increase = (predictions[-1]["averageRate"] / predictions[0]["averageRate"] - 1) * 100
-    avg_annual_increase = total_increase / request.years_to_predict if request.years_to_predict > 0 else 0
+    avg_annual_increase = total_increase / years_to_predict if years_to_predict > 0 else 0
 
     return {
-        "success": True,
-        "data": {
-            "currentRate": request.current_rate,
-            "region": request.region,
-            "predictions": predictions,
-            "summary": {
-                "totalIncrease": round(total_increase, 1),
-                "averageAnnualIncrease": round(avg_annual_increase, 1),
-                "rateIn10Years": predictions[-1]["averageRate"] if predictions else request.current_rate,
-                "modelType": "LinearRegression" if model else "fallback",
-            },
+        "currentRate": current_rate,
+        "region": region,
+        "predictions": predictions,
+        "summary": {
+            "totalIncrease": round(total_increase, 1),
+            "averageAnnualIncrease": round(avg_annual_increase, 1),
+            "rateIn10Years": predictions[-1]["averageRate"],
+            "modelType": type(model).__name__ if model else "fallback",
+            "modelVersion": model_version,
         },
     }
+
+
+@router.post("/rate-prediction")
+async def predict_electricity_rates(request: RatePredictionRequest):
+    """Predict electricity rate trends for the next N years"""
+    args = (request.region, request.current_rate, request.years_to_predict)
+    try:
+        data = forecast_rates(*args, get_model_version("rate_predictor", request.region))
+    except ModelChangedError as e:
+        # Reloaded between the two lookups; retry against the new model
+        data = forecast_rates(*args, e.version)
+    return {"success": True, "data": data}
+
+
+@router.get("/rate-prediction/models")
+async def list_rate_models():
+    """Models currently loaded by the registry, with their versions"""
+    return {"success": True, "data": get_registry().loaded()}
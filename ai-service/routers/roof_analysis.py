@@ -1,64 +1,191 @@
-from fastapi import APIRouter, UploadFile, File, Form
-from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from functools import partial
+import io
+import asyncio
+import json
 import numpy as np
-import cv2
 import math
+import threading
 import time
-from io import BytesIO
-from PIL import Image
+import zipfile
 from schemas.models import RoofAnalysisRequest
+from services.image_pool import get_image_pool, get_batch_pool, PoolSaturatedError
+from services.image_header import read_image_header, sniff_format
+from services.metrics import IMAGE_ANALYSIS_CPU
+from services.roof_cache import get_roof_cache, roof_cache_key
+from services.solar_ephemeris import solar_position, solar_time
+from services.solar_geometry import annual_shadow_profile, clear_sky_irradiance, shadow_factor
+from services.tracing import capture, is_active, merge, span
+from config import get_settings
 
 router = APIRouter()
 
+_UPLOAD_CHUNK = 64 * 1024
 
-def analyze_image_properties(contents: bytes) -> dict:
+# Reduced-size decode flags (cv2 attribute names), largest reduction first.
+# OpenCV itself is imported inside the functions that use it so the service
+# starts without paying for it until the first image is analyzed.
+_REDUCED_DECODE = (
+    (8, "IMREAD_REDUCED_COLOR_8"),
+    (4, "IMREAD_REDUCED_COLOR_4"),
+    (2, "IMREAD_REDUCED_COLOR_2"),
+)
+
+
+def decode_for_analysis(contents: bytes, full_width: int, full_height: int, max_side: int) -> np.ndarray:
+    """
+    Decode an upload at (roughly) analysis resolution.
+    Uses libjpeg's DCT-domain scaling via IMREAD_REDUCED_COLOR_* to pick the
+    smallest pyramid level whose long side is still >= max_side, then area-
+    resamples down to exactly max_side. max_side <= 0 decodes full resolution.
+    """
+    import cv2
+    flag = cv2.IMREAD_COLOR
+    longest = max(full_width, full_height)
+    if max_side > 0 and longest > max_side:
+        for factor, reduced_flag in _REDUCED_DECODE:
+            if longest / factor >= max_side:
+                flag = getattr(cv2, reduced_flag)
+                break
+
+    img = cv2.imdecode(np.frombuffer(contents, np.uint8), flag)
+    if img is None:
+        raise ValueError("Could not decode image")
+    return downscale(img, max_side)
+
+
+def downscale(img: np.ndarray, max_side: int) -> np.ndarray:
+    """Area-resample so the long side is at most max_side (no-op when <= 0 or already small)"""
+    h, w = img.shape[:2]
+    if max_side > 0 and max(h, w) > max_side:
+        import cv2
+        scale = max_side / max(h, w)
+        img = cv2.resize(img, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
+    return img
+
+
+# Edge density and Laplacian variance count per-pixel responses, so their
+# values depend on pixel scale in a content-dependent way (no single
+# correction factor holds). They are always measured on a frame with this
+# long side, which makes them independent of upload size and decode path and
+# keeps the roof-type thresholds meaningful.
+TEXTURE_SIDE = 1024
+
+
+# Largest analysis frame (pixels) whose buffers a worker thread keeps between
+# calls (~30 MB per thread). Bigger frames, e.g. full resolution with
+# ROOF_ANALYSIS_MAX_SIDE=0, get temporary buffers freed after the call.
+_SCRATCH_MAX_PIXELS = 2048 * 2048
+
+
+class _Frames:
+    def __init__(self, h: int, w: int, th: int, tw: int):
+        self.shape = (h, w, th, tw)
+        self.gray = np.empty((h, w), np.uint8)
+        self.thresh = np.empty((h, w), np.uint8)
+        self.hsv = np.empty((h, w, 3), np.uint8)
+        self.blur = np.empty((th, tw), np.uint8)
+        self.edges = np.empty((th, tw), np.uint8)
+        self.laplacian = np.empty((th, tw), np.float64)
+
+
+class _ScratchBuffers(threading.local):
+    """Per-worker-thread frame buffers, reused while the analysis shapes are unchanged"""
+    frames = None
+
+    def get(self, h: int, w: int, th: int, tw: int) -> _Frames:
+        if h * w > _SCRATCH_MAX_PIXELS:
+            return _Frames(h, w, th, tw)
+        if self.frames is None or self.frames.shape != (h, w, th, tw):
+            self.frames = _Frames(h, w, th, tw)
+        return self.frames
+
+
+_scratch = _ScratchBuffers()
+
+
+def analyze_image_properties(contents: bytes, max_side: Optional[int] = None) -> dict:
     """
-    Analyze actual image properties using OpenCV and PIL.
+    Analyze actual image properties using OpenCV.
     Extracts: brightness, contrast, edge density, dominant colors, dimensions.
+
+    The image is decoded at a long side of at most max_side (default
+    ROOF_ANALYSIS_MAX_SIDE, raised to TEXTURE_SIDE) for the brightness,
+    color and contour features; edge density and texture are measured at
+    TEXTURE_SIDE. width/height are reported at full resolution so the
+    pixel_area-based area estimate is unaffected. The image is decoded once;
+    dimensions come from the file header and the intermediate frames live in
+    per-thread scratch buffers.
     """
+    import cv2
+    if max_side is None:
+        max_side = get_settings().ROOF_ANALYSIS_MAX_SIDE
+    if max_side > 0:
+        max_side = max(max_side, TEXTURE_SIDE)
     try:
-        # Load with PIL for basic info
-        pil_img = Image.open(BytesIO(contents))
-        img_width, img_height = pil_img.size
+        with span("decode"):
+            # Dimensions from the header only (no pixel decode)
+            header = read_image_header(contents)
+            if header:
+                img_width, img_height = header.width, header.height
+                img = decode_for_analysis(contents, img_width, img_height, max_side)
+            else:
+                # Unrecognised header layout: decode at full size, measure, then downscale
+                img = decode_for_analysis(contents, 0, 0, 0)
+                img_height, img_width = img.shape[:2]
+                img = downscale(img, max_side)
         aspect_ratio = img_width / max(img_height, 1)
 
-        # Load with OpenCV for analysis
-        nparr = np.frombuffer(contents, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        if img is None:
-            raise ValueError("Could not decode image")
-
         h, w = img.shape[:2]
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        # Full-resolution dimensions in OpenCV's (EXIF-rotated) orientation
+        if (w >= h) == (img_width >= img_height):
+            full_w, full_h = img_width, img_height
+        else:
+            full_w, full_h = img_height, img_width
+
+        analysis_scale = max(w, h) / max(full_w, full_h, 1)
+        texture_scale = min(1.0, TEXTURE_SIDE / max(h, w))
+        th, tw = max(1, round(h * texture_scale)), max(1, round(w * texture_scale))
+        buf = _scratch.get(h, w, th, tw)
 
         # --- Brightness analysis ---
-        mean_brightness = float(np.mean(gray))
-        std_brightness = float(np.std(gray))
+        with span("brightness"):
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=buf.gray)
+            mean, std = cv2.meanStdDev(gray)
+            mean_brightness = float(mean[0, 0])
+            std_brightness = float(std[0, 0])
+            texture = gray if (th, tw) == (h, w) else cv2.resize(gray, (tw, th), interpolation=cv2.INTER_AREA)
 
         # --- Edge detection (indicates structures/obstructions) ---
-        edges = cv2.Canny(gray, 50, 150)
-        edge_density = float(np.sum(edges > 0)) / (h * w)
+        with span("canny"):
+            edges = cv2.Canny(texture, 50, 150, edges=buf.edges)
+            edge_density = cv2.countNonZero(edges) / (th * tw)
 
-        # --- Color analysis ---
-        hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV)
-        mean_hue = float(np.mean(hsv[:, :, 0]))
-        mean_saturation = float(np.mean(hsv[:, :, 1]))
-        mean_value = float(np.mean(hsv[:, :, 2]))
+        # --- Color analysis (all three channel means in one pass) ---
+        with span("color"):
+            hsv = cv2.cvtColor(img, cv2.COLOR_BGR2HSV, dst=buf.hsv)
+            mean_hue, mean_saturation, mean_value, _ = cv2.mean(hsv)
 
         # --- Texture analysis (variance in local regions) ---
         # High variance = complex roof structure; Low = flat/uniform
-        blur = cv2.GaussianBlur(gray, (5, 5), 0)
-        laplacian_var = float(cv2.Laplacian(blur, cv2.CV_64F).var())
+        with span("texture"):
+            blur = cv2.GaussianBlur(texture, (5, 5), 0, dst=buf.blur)
+            _, lap_std = cv2.meanStdDev(cv2.Laplacian(blur, cv2.CV_64F, dst=buf.laplacian))
+            laplacian_var = float(lap_std[0, 0]) ** 2
 
         # --- Contour detection (approximate obstruction count) ---
-        _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        # Filter small noise contours
-        significant_contours = [c for c in contours if cv2.contourArea(c) > (h * w * 0.005)]
+        with span("contours"):
+            _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=buf.thresh)
+            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            # Filter small noise contours
+            significant_contours = [c for c in contours if cv2.contourArea(c) > (h * w * 0.005)]
 
         return {
-            "width": w,
-            "height": h,
+            "width": full_w,
+            "height": full_h,
+            "analysis_scale": round(analysis_scale, 4),
             "aspect_ratio": round(aspect_ratio, 2),
             "mean_brightness": round(mean_brightness, 1),
             "std_brightness": round(std_brightness, 1),
@@ -76,6 +203,42 @@ def analyze_image_properties(contents: bytes) -> dict:
         return {"valid": False, "error": str(e)}
 
 
+async def _read_capped(file: UploadFile, max_bytes: int, check_first=None) -> bytearray:
+    too_large = HTTPException(status_code=413, detail=f"Upload exceeds {max_bytes} bytes")
+    if file.size is not None and file.size > max_bytes:
+        raise too_large
+
+    contents = bytearray(await file.read(_UPLOAD_CHUNK))
+    if check_first:
+        check_first(contents)
+    if len(contents) > max_bytes:
+        raise too_large
+    while True:
+        chunk = await file.read(_UPLOAD_CHUNK)
+        if not chunk:
+            break
+        if len(contents) + len(chunk) > max_bytes:
+            raise too_large
+        contents += chunk
+    return contents
+
+
+def _require_image(head: bytes):
+    if not sniff_format(head):
+        raise HTTPException(status_code=415, detail="Unsupported file type, expected an image")
+
+
+async def read_image_upload(file: UploadFile) -> bytearray:
+    """
+    Read an image upload chunk by chunk with a size cap.
+    The first chunk is sniffed for image magic bytes so non-images are rejected
+    (415) before the rest is read; oversized uploads are rejected (413) from the
+    declared size when known, otherwise as soon as the cap is crossed. Returns a
+    bytearray that np.frombuffer/cv2.imdecode can use without another copy.
+    """
+    return await _read_capped(file, get_settings().ROOF_UPLOAD_MAX_BYTES, _require_image)
+
+
 def derive_roof_from_image(img_props: dict, lat: float, lng: float) -> dict:
     """
     Derive roof characteristics from actual image analysis.
@@ -178,6 +341,33 @@ def derive_roof_from_image(img_props: dict, lat: float, lng: float) -> dict:
     }
 
 
+def analyze_image_timed(contents: bytes, max_side: int, traced: bool = False):
+    """
+    Pool entry point: img_props, the CPU seconds the worker spent on them and,
+    when traced, the per-stage spans for the request to merge().
+    Measured inside the worker so it is right for thread and process pools.
+    """
+    with capture(traced) as spans:
+        start = time.thread_time()
+        img_props = analyze_image_properties(contents, max_side)
+        cpu_seconds = time.thread_time() - start
+    return img_props, cpu_seconds, spans
+
+
+def analyze_roof_image(contents: bytes, lat: float, lng: float, max_side: int, traced: bool = False) -> dict:
+    """Process-pool entry point: CV features plus roof estimate for one image"""
+    start = time.perf_counter()
+    img_props, cpu_seconds, spans = analyze_image_timed(contents, max_side, traced)
+    analysis = derive_roof_from_image(img_props, lat, lng) if img_props.get("valid") else None
+    return {
+        "img_props": img_props,
+        "analysis": analysis,
+        "analysis_ms": round((time.perf_counter() - start) * 1000, 2),
+        "cpu_seconds": cpu_seconds,
+        "spans": spans,
+    }
+
+
 def derive_roof_from_coords(lat: float, lng: float, roof_area: float, roof_type: str = None) -> dict:
     """
     Derive roof characteristics from coordinates and user-selected roof type.
@@ -264,22 +454,41 @@ async def analyze_roof(
 ):
     """
     Analyze a rooftop from image or coordinates.
-    When an image is uploaded, real CV analysis is performed on pixels.
+    When an image is uploaded, real CV analysis is performed on pixels
+    in the image worker pool (a saturated pool answers 429); results are
+    cached by content hash so repeat uploads skip the analysis.
     """
     effective_lat = lat or 28.6139
     effective_lng = lng or 77.209
     effective_area = roof_area or 120.0
 
     if file:
+        contents = await read_image_upload(file)
         try:
-            contents = await file.read()
-            img_props = analyze_image_properties(contents)
+            max_side = get_settings().ROOF_ANALYSIS_MAX_SIDE
+            # Re-uploads of the same image skip OpenCV entirely
+            cache_key = await asyncio.to_thread(roof_cache_key, contents, max_side)
+            img_props = await get_roof_cache().get(cache_key)
+            if img_props is None:
+                img_props, cpu_seconds, spans = await get_image_pool().run(
+                    analyze_image_timed, contents, max_side, is_active()
+                )
+                merge(spans)
+                IMAGE_ANALYSIS_CPU.observe(cpu_seconds, endpoint="roof-analysis")
+                if img_props.get("valid"):
+                    await get_roof_cache().set(cache_key, img_props)
 
             if img_props.get("valid"):
                 analysis = derive_roof_from_image(img_props, effective_lat, effective_lng)
             else:
                 # Image couldn't be processed, fall back to coordinate-based
                 analysis = derive_roof_from_coords(effective_lat, effective_lng, effective_area)
+        except PoolSaturatedError:
+            raise HTTPException(
+                status_code=429,
+                detail="Image analysis is at capacity, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
         except Exception as e:
             print(f"Error processing file: {e}")
             analysis = derive_roof_from_coords(effective_lat, effective_lng, effective_area)
@@ -289,6 +498,119 @@ async def analyze_roof(
     return {"success": True, "data": analysis}
 
 
+def _read_zip_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytearray:
+    with zf.open(info) as fh:
+        contents = bytearray(fh.read(_UPLOAD_CHUNK))
+        _require_image(contents)
+        contents += fh.read()
+    return contents
+
+
+async def _read_zip_image(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytearray:
+    """
+    Read one archive member with the same size cap and image sniffing as direct
+    uploads. Decompression runs in a worker thread; zipfile serializes the
+    seeks on the shared archive file, and never inflates past info.file_size.
+    """
+    if info.file_size > get_settings().ROOF_UPLOAD_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image exceeds the per-image size limit")
+    return await asyncio.to_thread(_read_zip_member, zf, info)
+
+
+@router.post("/roof-analysis/batch")
+async def analyze_roof_batch(
+    files: Optional[List[UploadFile]] = File(None),
+    archive: Optional[UploadFile] = File(None),
+    lat: Optional[float] = Form(None),
+    lng: Optional[float] = Form(None),
+):
+    """
+    Analyze many rooftop images in one call (installer partners).
+    Accepts repeated `files` parts and/or a zip `archive`; images are fanned out
+    to the batch process pool and one NDJSON line per image is streamed back as
+    it finishes, with per-item timing.
+    """
+    settings = get_settings()
+    effective_lat = lat or 28.6139
+    effective_lng = lng or 77.209
+    max_side = settings.ROOF_ANALYSIS_MAX_SIDE
+    pool = get_batch_pool()
+    if pool.pending >= pool.workers + pool.max_queue:
+        raise HTTPException(status_code=429, detail="Batch analysis is at capacity, please retry shortly",
+                            headers={"Retry-After": "5"})
+
+    # (name, loader) pairs; loaders read lazily so only in-flight images sit in memory
+    items = [(f.filename, partial(read_image_upload, f)) for f in files or []]
+    if archive:
+        # Members are read straight from the spooled upload, so the archive is never copied into memory
+        archive_size = archive.size
+        if archive_size is None:
+            archive_size = await asyncio.to_thread(archive.file.seek, 0, io.SEEK_END)
+        if archive_size > settings.ROOF_BATCH_MAX_ARCHIVE_BYTES:
+            raise HTTPException(status_code=413,
+                                detail=f"Upload exceeds {settings.ROOF_BATCH_MAX_ARCHIVE_BYTES} bytes")
+        try:
+            zf = await asyncio.to_thread(zipfile.ZipFile, archive.file)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=415, detail="Archive is not a valid zip file")
+        for info in zf.infolist():
+            if not info.is_dir():
+                items.append((info.filename, partial(_read_zip_image, zf, info)))
+    if not items:
+        raise HTTPException(status_code=422, detail="Provide image files or a zip archive")
+    if len(items) > settings.ROOF_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {settings.ROOF_BATCH_MAX_ITEMS} images")
+
+    feed = asyncio.Semaphore(pool.workers)
+
+    async def run_item(index: int, name: str, load) -> dict:
+        start = time.perf_counter()
+        result = {"index": index, "filename": name}
+        async with feed:
+            try:
+                contents = await load()
+                cache_key = await asyncio.to_thread(roof_cache_key, contents, max_side)
+                img_props = await get_roof_cache().get(cache_key)
+                if img_props is not None:
+                    output = {"img_props": img_props, "analysis_ms": 0.0,
+                              "analysis": derive_roof_from_image(img_props, effective_lat, effective_lng)}
+                else:
+                    output = await pool.run(
+                        analyze_roof_image, contents, effective_lat, effective_lng, max_side, is_active()
+                    )
+                    merge(output["spans"])
+                    IMAGE_ANALYSIS_CPU.observe(output["cpu_seconds"], endpoint="roof-analysis/batch")
+                    if output["analysis"] is not None:
+                        await get_roof_cache().set(cache_key, output["img_props"])
+                if output["analysis"] is None:
+                    result.update(success=False, error=output["img_props"].get("error", "Could not analyze image"))
+                else:
+                    result.update(success=True, cached=img_props is not None, data=output["analysis"])
+                analysis_ms = output["analysis_ms"]
+            except HTTPException as e:
+                result.update(success=False, error=e.detail)
+                analysis_ms = 0.0
+            except PoolSaturatedError:
+                result.update(success=False, error="Batch analysis is at capacity")
+                analysis_ms = 0.0
+            except Exception as e:
+                result.update(success=False, error=str(e))
+                analysis_ms = 0.0
+        result["timing"] = {"analysisMs": analysis_ms, "totalMs": round((time.perf_counter() - start) * 1000, 2)}
+        return result
+
+    async def stream():
+        tasks = [asyncio.ensure_future(run_item(i, name, load)) for i, (name, load) in enumerate(items)]
+        try:
+            for done in asyncio.as_completed(tasks):
+                yield json.dumps(await done) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
 @router.post("/roof-analysis-json")
 async def analyze_roof_json(request: RoofAnalysisRequest):
     """
@@ -309,43 +631,45 @@ async def shadow_analysis(
     lng: float = 77.209,
     roof_area: float = 100.0,
     date: Optional[str] = None,
+    utc_offset: Optional[float] = None,
 ):
     """Time-based shadow simulation for solar panels"""
     from datetime import datetime
-    now = datetime.now()
-    day_of_year = now.timetuple().tm_yday
-
-    hourly_data = {}
-    for hour in range(6, 19):
-        solar_noon = 12.5
-        hour_angle = (hour - solar_noon) * 15
-        latitude_rad = np.radians(abs(lat))
-        declination = np.radians(23.45 * np.sin(np.radians(360 / 365 * (day_of_year + 284))))
-
-        altitude = np.degrees(np.arcsin(
-            np.sin(latitude_rad) * np.sin(declination) +
-            np.cos(latitude_rad) * np.cos(declination) * np.cos(np.radians(hour_angle))
-        ))
-        altitude = max(0, altitude)
-
-        shadow_factor = max(0, 1 - altitude / 90) * 0.3
-        irradiance = max(0, np.sin(np.radians(altitude))) * 1000 * (0.85 + np.random.uniform(-0.05, 0.05))
-
-        hourly_data[f"{hour:02d}:00"] = {
-            "solarAltitude": round(altitude, 1),
-            "shadowFactor": round(shadow_factor, 3),
-            "irradiance": round(irradiance, 1),
-            "shadowArea": round(roof_area * shadow_factor, 2),
-            "effectiveArea": round(roof_area * (1 - shadow_factor), 2),
+    try:
+        day = datetime.strptime(date, "%Y-%m-%d") if date else datetime.now()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="date must be YYYY-MM-DD")
+    day_index = day.timetuple().tm_yday - 1
+
+    # Hourly profile for the requested day, in local clock time
+    hours = np.arange(6, 19)
+    solar_hours = solar_time(hours, day_index, lng, day.year, utc_offset)
+    altitude, _ = solar_position(lat, day_index, solar_hours, day.year)
+    altitude = np.maximum(altitude, 0)
+    shadow = shadow_factor(altitude)
+    irradiance = clear_sky_irradiance(altitude) / 0.85 * (0.85 + np.random.uniform(-0.05, 0.05, hours.size))
+
+    hourly_data = {
+        f"{hour:02d}:00": {
+            "solarAltitude": round(float(alt), 1),
+            "shadowFactor": round(float(sf), 3),
+            "irradiance": round(float(irr), 1),
+            "shadowArea": round(roof_area * float(sf), 2),
+            "effectiveArea": round(roof_area * (1 - float(sf)), 2),
         }
+        for hour, alt, sf, irr in zip(hours, altitude, shadow, irradiance)
+    }
 
-    annual_loss = round(np.mean([d["shadowFactor"] for d in hourly_data.values()]) * 100, 1)
+    # Full-year loss over every time step, cached per latitude tile and year
+    with span("shadow_profile"):
+        annual = annual_shadow_profile(lat, day.year, get_settings().SHADOW_TIME_STEP_MINUTES)
 
     return {
         "success": True,
         "data": {
             "hourlyData": hourly_data,
-            "annualShadowLoss": annual_loss,
+            "annualShadowLoss": annual["annualShadowLoss"],
+            "monthlyShadowLoss": annual["monthlyShadowLoss"],
             "bestHours": "10:00 - 14:00",
             "peakIrradiance": max(d["irradiance"] for d in hourly_data.values()),
         },
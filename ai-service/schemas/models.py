@@ -1,5 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Annotated, Optional, List, Literal
+
+# Largest roof (m^2) panel placement will pack (~15,000 panels). Packing time
+# and memory grow with the area, so larger values are rejected with a 422.
+MAX_ROOF_AREA = 50_000.0
 
 
 class RoofAnalysisRequest(BaseModel):
@@ -21,12 +25,31 @@ class RoofAnalysisResponse(BaseModel):
 
 
 class PanelPlacementRequest(BaseModel):
-    usable_area: float = Field(..., gt=0)
+    usable_area: float = Field(..., gt=0, le=MAX_ROOF_AREA)
     lat: float = Field(..., ge=-90, le=90)
     lng: float = Field(..., ge=-180, le=180)
     roof_tilt: float = Field(default=15, ge=0, le=90)
-    roof_orientation: str = Field(default="south")
+    roof_orientation: Optional[str] = Field(None, description="Compass direction the roof faces (south, northeast, ...). None or \"auto\" = equator-facing.")
     panel_wattage: int = Field(default=400, ge=100, le=700)
+    roof_polygon: Optional[List[List[float]]] = Field(None, description="Roof outline in metres, or normalized [0, 1] image coordinates scaled to roof_area")
+    obstructions: List[Obstruction] = Field(default_factory=list)
+    roof_area: Optional[float] = Field(None, gt=0, le=MAX_ROOF_AREA, description="Area the normalized roof_polygon encloses. Defaults to usable_area.")
+    layout_format: Literal["objects", "columnar", "binary"] = Field(default="objects", description="objects = one dict per panel; columnar/binary = compact arrays for large roofs")
+
+
+class PanelSweepRequest(BaseModel):
+    usable_area: float = Field(..., gt=0, le=MAX_ROOF_AREA)
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    roof_polygon: Optional[List[List[float]]] = None
+    obstructions: List[Obstruction] = Field(default_factory=list)
+    roof_area: Optional[float] = Field(None, gt=0, le=MAX_ROOF_AREA)
+    roof_orientation: Optional[str] = Field(None, description="Compass direction the roof faces (south, northeast, ...). None or \"auto\" = equator-facing.")
+    panel_wattages: List[Annotated[int, Field(ge=100, le=700)]] = Field(default=[400], min_length=1, max_length=50)
+    tilts: Optional[List[Annotated[float, Field(ge=0, le=90)]]] = Field(None, max_length=50, description="Panel tilts to compare. Defaults to the optimal tilt.")
+    row_spacings: Optional[List[Annotated[float, Field(gt=0)]]] = Field(None, max_length=20, description="Inter-row gaps (m). Defaults to the shading-free gap for each tilt.")
+    rank_by: Literal["annualProduction", "specificYield"] = "annualProduction"
+    top_n: Optional[int] = Field(None, ge=1)
 
 
 class PanelPlacementResponse(BaseModel):
@@ -40,6 +63,19 @@ class DustPredictionRequest(BaseModel):
     days_since_cleaning: int = 15
 
 
+class DustBatchSite(BaseModel):
+    site_id: str
+    lat: float = Field(..., ge=-90, le=90)
+    lng: float = Field(..., ge=-180, le=180)
+    days_since_cleaning: int = Field(default=15, ge=0)
+
+
+class DustBatchRequest(BaseModel):
+    # Raw dicts: each site is validated as a DustBatchSite on its own, so one bad
+    # record gets an error line instead of failing the whole batch with a 422
+    sites: List[dict] = Field(..., min_length=1, max_length=10000)
+
+
 class CleaningScheduleRequest(BaseModel):
     lat: float
     lng: float
@@ -53,7 +89,7 @@ class CleaningScheduleRequest(BaseModel):
 class RatePredictionRequest(BaseModel):
     region: str = "Pakistan"
     current_rate: float = 25.0  # Approx PKR rate
-    years_to_predict: int = 10
+    years_to_predict: int = Field(default=10, ge=0, le=50)
 
 
 class SolarIrradianceResponse(BaseModel):
@@ -0,0 +1,81 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache with optional time-to-live.
+
+    With `align_ttl=True` entries expire at the next wall-clock multiple of
+    `ttl` (e.g. every quarter hour) instead of `ttl` seconds after insertion,
+    which matches upstreams that publish on a fixed schedule.
+    Not thread-safe: use it from the event loop only.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, align_ttl: bool = False):
+        self.maxsize = max(1, int(maxsize))
+        self.ttl = ttl
+        self.align_ttl = align_ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expiry(self, now: float) -> float:
+        if not self.ttl:
+            return math.inf
+        if self.align_ttl:
+            return (math.floor(now / self.ttl) + 1) * self.ttl
+        return now + self.ttl
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+        self.misses += 1
+        return None
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (self._expiry(time.time()), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxSize": self.maxsize,
+            "ttlSeconds": self.ttl,
+        }
+
+
+def tile_key(lat: float, lng: float, resolution: float) -> Tuple[int, int]:
+    """Quantize a coordinate to the index of its `resolution`-degree tile"""
+    return math.floor(lat / resolution), math.floor(lng / resolution)
+
+
+def tile_center(key: Tuple[int, int], resolution: float) -> Tuple[float, float]:
+    """Centre coordinate of a tile returned by `tile_key`"""
+    return (
+        round((key[0] + 0.5) * resolution, 6),
+        round((key[1] + 0.5) * resolution, 6),
+    )
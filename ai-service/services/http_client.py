@@ -0,0 +1,99 @@
+import time
+from typing import TYPE_CHECKING, Dict, Optional
+from urllib.parse import urlsplit
+
+from config import Settings, get_settings
+from services.metrics import UPSTREAM_ERRORS, UPSTREAM_REQUEST_DURATION
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class HttpClientManager:
+    """
+    Application-scoped pool of outbound HTTP clients.
+
+    One keep-alive AsyncClient is kept per upstream host (Open-Meteo,
+    NASA POWER, OpenWeatherMap, ...) so each host gets its own connection
+    limit and repeated calls reuse warm TCP/TLS connections. httpx is
+    imported when the first client is created, not at service start.
+    """
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+        self._clients: Dict[str, "httpx.AsyncClient"] = {}
+
+    def timeout(self, seconds: float) -> "httpx.Timeout":
+        """Total request timeout with the configured (shorter) connect timeout"""
+        import httpx
+        return httpx.Timeout(seconds, connect=min(seconds, self._settings.HTTP_CONNECT_TIMEOUT))
+
+    def client_for(self, url: str) -> "httpx.AsyncClient":
+        """Get (or lazily create) the pooled client for the host of `url`"""
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            import httpx
+            client = httpx.AsyncClient(
+                http2=self._settings.HTTP2_ENABLED,
+                limits=httpx.Limits(
+                    max_connections=self._settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+                    max_keepalive_connections=self._settings.HTTP_MAX_KEEPALIVE_PER_HOST,
+                    keepalive_expiry=self._settings.HTTP_KEEPALIVE_EXPIRY,
+                ),
+                timeout=self.timeout(self._settings.HTTP_TIMEOUT),
+            )
+            self._clients[origin] = client
+        return client
+
+    async def get(self, url: str, timeout: Optional[float] = None, provider: Optional[str] = None,
+                  **kwargs) -> "httpx.Response":
+        """GET through the host's pooled client, timed per `provider` (defaults to the host name)"""
+        client = self.client_for(url)
+        if timeout is not None:
+            kwargs["timeout"] = self.timeout(timeout)
+        provider = provider or urlsplit(url).hostname or "unknown"
+        start = time.perf_counter()
+        try:
+            response = await client.get(url, **kwargs)
+        except Exception as e:
+            UPSTREAM_REQUEST_DURATION.observe(time.perf_counter() - start, provider=provider, outcome="exception")
+            UPSTREAM_ERRORS.inc(provider=provider, kind=type(e).__name__)
+            raise
+        ok = response.status_code < 400
+        UPSTREAM_REQUEST_DURATION.observe(time.perf_counter() - start, provider=provider,
+                                          outcome="ok" if ok else "http_error")
+        if not ok:
+            UPSTREAM_ERRORS.inc(provider=provider, kind=f"{response.status_code // 100}xx")
+        return response
+
+    async def aclose(self):
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+_manager: Optional[HttpClientManager] = None
+
+
+def start_http_clients(settings: Optional[Settings] = None) -> HttpClientManager:
+    """Create the shared client manager (called from the app lifespan)"""
+    global _manager
+    _manager = HttpClientManager(settings or get_settings())
+    return _manager
+
+
+async def close_http_clients():
+    """Close all pooled connections (called on shutdown)"""
+    global _manager
+    if _manager is not None:
+        await _manager.aclose()
+        _manager = None
+
+
+def get_http_client() -> HttpClientManager:
+    """Get the shared client manager, creating it if the lifespan hook has not run"""
+    if _manager is None:
+        return start_http_clients()
+    return _manager
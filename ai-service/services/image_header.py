@@ -0,0 +1,91 @@
+import struct
+from typing import NamedTuple, Optional
+
+
+class ImageHeader(NamedTuple):
+    format: str
+    width: int
+    height: int
+
+
+# JPEG start-of-frame markers carrying the frame size (excludes DHT/JPG/DAC)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def sniff_format(buf: bytes) -> Optional[str]:
+    """Identify a supported image format from its magic bytes"""
+    if buf[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if buf[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if buf[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if buf[:2] == b"BM":
+        return "bmp"
+    if buf[:4] == b"RIFF" and buf[8:12] == b"WEBP":
+        return "webp"
+    if buf[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff"
+    return None
+
+
+def _jpeg_size(buf: bytes) -> Optional[tuple]:
+    i = 2
+    n = len(buf)
+    while i + 4 <= n:
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:  # standalone markers
+            i += 2
+            continue
+        (length,) = struct.unpack(">H", buf[i + 2:i + 4])
+        if marker in _JPEG_SOF:
+            if i + 9 > n:
+                return None
+            height, width = struct.unpack(">HH", buf[i + 5:i + 9])
+            return width, height
+        i += 2 + length
+    return None
+
+
+def _webp_size(buf: bytes) -> Optional[tuple]:
+    chunk = buf[12:16]
+    if chunk == b"VP8 " and len(buf) >= 30:
+        w, h = struct.unpack("<HH", buf[26:30])
+        return w & 0x3FFF, h & 0x3FFF
+    if chunk == b"VP8L" and len(buf) >= 25:
+        bits = int.from_bytes(buf[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(buf) >= 30:
+        return int.from_bytes(buf[24:27], "little") + 1, int.from_bytes(buf[27:30], "little") + 1
+    return None
+
+
+def read_image_header(buf: bytes) -> Optional[ImageHeader]:
+    """
+    Read format and pixel dimensions from the first bytes of an image
+    without decoding it. Returns None for unknown or truncated headers.
+    """
+    fmt = sniff_format(buf)
+    size = None
+    try:
+        if fmt == "jpeg":
+            size = _jpeg_size(buf)
+        elif fmt == "png" and len(buf) >= 24:
+            size = struct.unpack(">II", buf[16:24])
+        elif fmt == "gif" and len(buf) >= 10:
+            size = struct.unpack("<HH", buf[6:10])
+        elif fmt == "bmp" and len(buf) >= 26:
+            w, h = struct.unpack("<ii", buf[18:26])
+            size = (w, abs(h))
+        elif fmt == "webp":
+            size = _webp_size(buf)
+    except struct.error:
+        size = None
+    if not size or size[0] <= 0 or size[1] <= 0:
+        return None
+    return ImageHeader(fmt, int(size[0]), int(size[1]))
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from config import get_settings
+
+
+class PoolSaturatedError(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class BoundedPool:
+    """
+    Thread or process pool for CPU-bound work, with a cap on queued jobs.
+
+    At most `workers` jobs run and `max_queue` more wait; further submissions
+    fail fast with PoolSaturatedError so callers can answer 429 instead of
+    piling requests onto an already saturated node.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int = 0, max_queue: int = 16, name: str = "pool"):
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self._pending = 0
+        self._pending_lock = threading.Lock()  # the done-callback runs on a worker/manager thread
+        if kind == "process":
+            self._executor: Executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        with self._pending_lock:
+            if self._pending >= self.workers + self.max_queue:
+                raise PoolSaturatedError(f"{self._pending} jobs pending (limit {self.workers + self.max_queue})")
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._job_done(None)
+            raise
+        # A job keeps its slot until it actually finishes (or is cancelled before
+        # starting), even when the awaiting request is cancelled first
+        future.add_done_callback(self._job_done)
+        return await asyncio.wrap_future(future)
+
+    def _job_done(self, _future):
+        with self._pending_lock:
+            self._pending -= 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_image_pool: Optional[BoundedPool] = None
+_batch_pool: Optional[BoundedPool] = None
+
+
+def get_image_pool() -> BoundedPool:
+    """Shared pool for roof image analysis, sized from IMAGE_POOL_* settings"""
+    global _image_pool
+    if _image_pool is None:
+        settings = get_settings()
+        _image_pool = BoundedPool(
+            kind=settings.IMAGE_POOL_KIND,
+            workers=settings.IMAGE_POOL_WORKERS,
+            max_queue=settings.IMAGE_POOL_MAX_QUEUE,
+            name="roof-cv",
+        )
+    return _image_pool
+
+
+def get_batch_pool() -> BoundedPool:
+    """Process pool for batch roof analysis, one worker per core by default"""
+    global _batch_pool
+    if _batch_pool is None:
+        settings = get_settings()
+        _batch_pool = BoundedPool(
+            kind="process",
+            workers=settings.ROOF_BATCH_WORKERS,
+            max_queue=settings.ROOF_BATCH_MAX_QUEUE,
+            name="roof-batch",
+        )
+    return _batch_pool
+
+
+def shutdown_image_pool():
+    global _image_pool, _batch_pool
+    for pool in (_image_pool, _batch_pool):
+        if pool is not None:
+            pool.shutdown()
+    _image_pool = _batch_pool = None
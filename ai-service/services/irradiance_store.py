@@ -0,0 +1,201 @@
+"""
+Persistent store for NASA POWER monthly irradiance climatology.
+
+The ALLSKY_SFC_SW_DWN (and T2M) climatology never changes, so it is kept in a local
+SQLite database keyed by NASA POWER's native 0.5 deg x 0.625 deg grid cell.
+Cells are filled on first miss by fetch_solar_irradiance, or in bulk with:
+
+    python -m services.irradiance_store prefill region.json
+    python -m services.irradiance_store prefill region.csv --db ./data/irradiance.sqlite3
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Optional, Tuple
+
+from config import get_settings
+
+# NASA POWER (MERRA-2) grid resolution in degrees
+GRID_LAT_DEG = 0.5
+GRID_LNG_DEG = 0.625
+
+_MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+
+
+def grid_cell(lat: float, lng: float) -> Tuple[int, int]:
+    """Index of the NASA POWER grid cell whose centre is nearest to the point"""
+    return (
+        int(math.floor((lat + 90.0) / GRID_LAT_DEG + 0.5)),
+        int(math.floor((lng + 180.0) / GRID_LNG_DEG + 0.5)),
+    )
+
+
+def monthly_climatology(series: Optional[dict], minimum: float) -> Optional[list]:
+    """
+    Mean value per calendar month (Jan..Dec) of a NASA POWER {YYYYMM: value}
+    series, averaged over the years present. POWER's month 13 (annual value)
+    and fill values below `minimum` are ignored. None unless every month has data.
+    """
+    by_month = [[] for _ in range(12)]
+    for key, value in (series or {}).items():
+        key = str(key)
+        if len(key) != 6 or not key.isdigit() or not isinstance(value, (int, float)) or value < minimum:
+            continue
+        month = int(key[4:])
+        if 1 <= month <= 12:
+            by_month[month - 1].append(float(value))
+    if not all(by_month):
+        return None
+    return [sum(values) / len(values) for values in by_month]
+
+
+def summarize_power_monthly(monthly: dict, temperature: Optional[dict] = None) -> Optional[dict]:
+    """
+    Turn a NASA POWER {YYYYMM: value} series into the irradiance payload, or
+    None when any calendar month is missing. An optional T2M series adds
+    monthlyTemperature (°C) for the yield model.
+    """
+    values = monthly_climatology(monthly, minimum=0.0)  # zeros are real (polar night)
+    if values is None or sum(values) <= 0:
+        return None
+    annual_average = sum(values) / 12
+    payload = {
+        "annualAverage": round(annual_average, 2),
+        "monthlyValues": [round(v, 2) for v in values],
+        "peakSunHours": round(annual_average, 2),
+        "source": "NASA POWER API",
+    }
+    temps = monthly_climatology(temperature, minimum=-998.0)  # POWER fills gaps with -999
+    if temps is not None:
+        payload["monthlyTemperature"] = [round(v, 1) for v in temps]
+    return payload
+
+
+class IrradianceStore:
+    """SQLite-backed (memory-mapped) irradiance cache keyed by grid cell"""
+
+    def __init__(self, path: str):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA mmap_size=268435456")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS irradiance (
+                lat_idx INTEGER NOT NULL,
+                lng_idx INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (lat_idx, lng_idx)
+            ) WITHOUT ROWID"""
+        )
+        self._conn.commit()
+
+    def get(self, lat: float, lng: float) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM irradiance WHERE lat_idx = ? AND lng_idx = ?",
+                grid_cell(lat, lng),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, lat: float, lng: float, payload: dict):
+        self.put_many([(lat, lng, payload)])
+
+    def put_many(self, rows: Iterable[Tuple[float, float, dict]]) -> int:
+        now = time.time()
+        records = [(*grid_cell(lat, lng), json.dumps(payload), now) for lat, lng, payload in rows]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO irradiance (lat_idx, lng_idx, payload, updated_at) VALUES (?, ?, ?, ?)",
+                records,
+            )
+            self._conn.commit()
+        return len(records)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM irradiance").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[IrradianceStore] = None
+
+
+def get_irradiance_store() -> IrradianceStore:
+    """Get the process-wide store, opening IRRADIANCE_DB_PATH on first use"""
+    global _store
+    if _store is None:
+        _store = IrradianceStore(get_settings().IRRADIANCE_DB_PATH)
+    return _store
+
+
+def close_irradiance_store():
+    global _store
+    if _store is not None:
+        _store.close()
+        _store = None
+
+
+# ---------- Bulk prefill ----------
+
+def _rows_from_json(data: dict):
+    """NASA POWER point response, or a regional FeatureCollection"""
+    features = data.get("features") if data.get("type") == "FeatureCollection" else [data]
+    for feature in features or []:
+        lng, lat = feature["geometry"]["coordinates"][:2]
+        parameters = feature.get("properties", {}).get("parameter", {})
+        payload = summarize_power_monthly(parameters.get("ALLSKY_SFC_SW_DWN", {}), parameters.get("T2M"))
+        if payload:
+            yield lat, lng, payload
+
+
+def _rows_from_csv(fh):
+    """CSV with lat/lng (or LAT/LON) columns and JAN..DEC monthly kWh/m²/day"""
+    reader = csv.DictReader(fh)
+    for row in reader:
+        row = {k.strip().upper(): v for k, v in row.items() if k}
+        lat = float(row.get("LAT", row.get("LATITUDE")))
+        lng = float(row.get("LNG", row.get("LON", row.get("LONGITUDE"))))
+        monthly = {f"2000{i + 1:02d}": float(row[m]) for i, m in enumerate(_MONTHS) if row.get(m)}
+        payload = summarize_power_monthly(monthly)
+        if payload:
+            yield lat, lng, payload
+
+
+def prefill(path: str, store: IrradianceStore) -> int:
+    """Ingest a local NASA POWER JSON export or monthly CSV into the store"""
+    with open(path, newline="") as fh:
+        if path.lower().endswith(".json"):
+            rows = list(_rows_from_json(json.load(fh)))
+        else:
+            rows = list(_rows_from_csv(fh))
+    return store.put_many(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NASA POWER irradiance store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fill = sub.add_parser("prefill", help="ingest a region from a local JSON/CSV file")
+    fill.add_argument("file")
+    fill.add_argument("--db", default=None, help="database path (default: IRRADIANCE_DB_PATH)")
+    args = parser.parse_args(argv)
+
+    store = IrradianceStore(args.db or get_settings().IRRADIANCE_DB_PATH)
+    inserted = prefill(args.file, store)
+    print(f"  [OK] Stored {inserted} cell(s); {store.count()} cell(s) in {store.path}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
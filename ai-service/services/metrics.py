@@ -0,0 +1,203 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Counters, gauges and histograms keyed by label values; everything is
+registered on module import and exported by GET /metrics. Request latency
+and in-flight gauges come from MetricsMiddleware, upstream calls are timed
+by HttpClientManager.get.
+"""
+import bisect
+import threading
+import time
+from typing import Dict, Sequence, Tuple
+
+# Seconds; covers cached responses (sub-ms) up to slow upstream timeouts
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = []
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{str(v)}"'.replace("\n", " ") for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(labels.get(n, "") for n in self.label_names)
+
+    def render(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> list:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, k)} {v:g}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def _samples(self) -> list:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            labels = _format_labels(self.label_names, key)
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = _format_labels(self.label_names, key, 'le="{:g}"'.format(bound))
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            le = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{le} {series[-1]}")
+            lines.append(f"{self.name}_sum{labels} {series[-2]:g}")
+            lines.append(f"{self.name}_count{labels} {series[-1]}")
+        return lines
+
+
+def render_metrics() -> str:
+    return "\n".join(line for metric in _registry for line in metric.render()) + "\n"
+
+
+# ---------- Service metrics ----------
+
+HTTP_REQUEST_DURATION = Histogram(
+    "smartsolar_ai_http_request_duration_seconds",
+    "Request latency by route template, including streamed bodies",
+    ["method", "route", "status"],
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "smartsolar_ai_http_requests_in_flight", "Requests currently being handled, by path group (/ai/dust, ...)",
+    ["method", "group"],
+)
+UPSTREAM_REQUEST_DURATION = Histogram(
+    "smartsolar_ai_upstream_request_duration_seconds",
+    "Outbound API call latency by provider",
+    ["provider", "outcome"],
+)
+UPSTREAM_ERRORS = Counter(
+    "smartsolar_ai_upstream_errors_total",
+    "Outbound API calls that failed, by provider and HTTP status class or exception type",
+    ["provider", "kind"],
+)
+FALLBACK_ESTIMATES = Counter(
+    "smartsolar_ai_fallback_estimates_total",
+    "Responses built from local estimates because the upstream data was unavailable",
+    ["source"],
+)
+IMAGE_ANALYSIS_CPU = Histogram(
+    "smartsolar_ai_image_analysis_cpu_seconds",
+    "CPU time spent in OpenCV feature extraction per image",
+    ["endpoint"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+
+
+def route_template(scope) -> str:
+    """Matched route path with its router prefix, e.g. /ai/solar-irradiance/{lat}/{lng}"""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Included routers keep their own (unprefixed) path; recover the prefix from the request path
+    segments = scope["path"].split("/")
+    prefix = "/".join(segments[:max(1, len(segments) - (len(template.split("/")) - 1))])
+    return prefix + template
+
+
+# Distinct in-flight label values; unknown paths beyond this collapse into "other"
+_MAX_ROUTE_GROUPS = 32
+_route_groups = set()
+
+
+def _route_group(path: str) -> str:
+    """First two path segments (/ai/dust, /health), known before routing"""
+    group = "/".join(path.split("/")[:3]) or "/"
+    if group not in _route_groups:
+        if len(_route_groups) >= _MAX_ROUTE_GROUPS:
+            return "other"
+        _route_groups.add(group)
+    return group
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency (until the last body chunk) and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        group = _route_group(scope["path"])
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc(method=method, group=group)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec(method=method, group=group)
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - start, method=method, route=route_template(scope), status=str(status["code"])
+            )
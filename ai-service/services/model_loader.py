@@ -1,36 +1,198 @@
+"""
+Model registry plus the offline build step that trains the shared models:
+
+    python -m services.model_loader            # train models whose files are missing
+    python -m services.model_loader --force    # retrain everything
+
+joblib and scikit-learn are imported only when a model is first loaded or
+trained, so neither is on the service's startup path.
+"""
+import argparse
 import os
-import joblib
-import numpy as np
-from sklearn.linear_model import LinearRegression
+import re
+import threading
+import time
+from config import get_settings
 
-_models = {}
 
+class ModelRegistry:
+    """
+    Per-region models loaded lazily from MODEL_DIR.
 
-def load_all_models():
-    """Load or create all ML models"""
-    model_dir = os.getenv("MODEL_DIR", "./ml_models/saved")
-    os.makedirs(model_dir, exist_ok=True)
+    `<name>_<region>.joblib` is used when present, otherwise the shared
+    `<name>.joblib`. Only regions with their own file get an entry; every
+    other region shares the default one, so arbitrary region strings cannot
+    grow the registry. Arrays are memory-mapped (mmap_mode='r') so uvicorn
+    workers share the same pages. Every `reload_interval` seconds a lookup
+    re-lists MODEL_DIR and re-stats the file, reloading it when its mtime
+    changed, so new model files take effect without a restart. With
+    reload_interval <= 0 files are only re-read after reload().
+    """
+
+    def __init__(self, model_dir: str, reload_interval: float = 30.0):
+        self.model_dir = model_dir
+        self.reload_interval = reload_interval
+        self._entries = {}  # (name, region or "") -> {"path", "model", "version", "checked"}
+        self._files = {}  # path -> (version, model), shared by regions falling back to one file
+        self._listing = (frozenset(), None)  # (file names in model_dir, monotonic time listed)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def region_key(region) -> str:
+        return re.sub(r"[^a-z0-9]+", "_", (region or "").strip().lower()).strip("_")
+
+    def _is_stale(self, checked, now: float) -> bool:
+        # reload_interval <= 0: check once on first use, then only after reload()
+        return checked is None or (self.reload_interval > 0 and now - checked >= self.reload_interval)
+
+    def _model_files(self, now: float) -> frozenset:
+        names, checked = self._listing
+        if not self._is_stale(checked, now):
+            return names
+        with self._lock:
+            try:
+                names = frozenset(os.listdir(self.model_dir))
+            except FileNotFoundError:
+                names = frozenset()
+            self._listing = (names, now)
+            # Forget regions whose file was removed; they fall back to the default entry
+            for key in [k for k in self._entries if k[1] and f"{k[0]}_{k[1]}.joblib" not in names]:
+                del self._entries[key]
+        return names
+
+    def _key(self, name: str, region, now: float) -> tuple:
+        region = self.region_key(region)
+        if region and f"{name}_{region}.joblib" in self._model_files(now):
+            return name, region
+        return name, ""
+
+    def _resolve(self, name: str, region: str):
+        file_name = f"{name}_{region}.joblib" if region else f"{name}.joblib"
+        path = os.path.join(self.model_dir, file_name)
+        return path if os.path.exists(path) else None
+
+    def _entry(self, name: str, region=None) -> dict:
+        now = time.monotonic()
+        key = self._key(name, region, now)
+        entry = self._entries.get(key)
+        if entry is not None and not self._is_stale(entry["checked"], now):
+            return entry
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._is_stale(entry["checked"], now):
+                return entry
+            path = self._resolve(*key)
+            version = int(os.stat(path).st_mtime_ns) if path else None
+            if entry is None or entry["path"] != path or entry["version"] != version:
+                if entry is not None:
+                    print(f"  [OK] Reloading model {name} ({key[1] or 'default'}) from {path}")
+                entry = {"path": path, "model": self._load(path, version), "version": version}
+            entry = {**entry, "checked": now}
+            self._entries[key] = entry
+            return entry
+
+    def _load(self, path, version):
+        if path is None:
+            return None
+        cached = self._files.get(path)
+        if cached is None or cached[0] != version:
+            import joblib
+            cached = (version, joblib.load(path, mmap_mode="r"))
+            self._files[path] = cached
+        return cached[1]
+
+    @staticmethod
+    def _version(entry: dict):
+        if entry["path"] is None:
+            return None
+        return f"{os.path.basename(entry['path'])}@{entry['version']}"
+
+    def get(self, name: str, region=None):
+        return self._entry(name, region)["model"]
+
+    def version(self, name: str, region=None):
+        return self._version(self._entry(name, region))
+
+    def lookup(self, name: str, region=None) -> tuple:
+        """(model, version) from one registry entry, so a reload cannot split the pair"""
+        entry = self._entry(name, region)
+        return entry["model"], self._version(entry)
+
+    def reload(self):
+        """Drop every loaded model; the next lookup reloads from disk"""
+        with self._lock:
+            self._entries.clear()
+            self._files.clear()
+            self._listing = (frozenset(), None)
+
+    def loaded(self) -> dict:
+        return {f"{name}:{region or 'default'}": entry["version"]
+                for (name, region), entry in self._entries.items() if entry["path"]}
 
-    # Rate prediction model
-    rate_model_path = os.path.join(model_dir, "rate_predictor.joblib")
-    if os.path.exists(rate_model_path):
-        _models["rate_predictor"] = joblib.load(rate_model_path)
-    else:
-        _models["rate_predictor"] = _train_rate_model(model_dir)
+
+_registry = None
+
+
+def get_registry() -> ModelRegistry:
+    global _registry
+    if _registry is None:
+        settings = get_settings()
+        _registry = ModelRegistry(settings.MODEL_DIR, settings.MODEL_RELOAD_INTERVAL)
+    return _registry
+
+
+# Shared model files and the functions that train them (offline build step)
+_TRAINERS = {
+    "rate_predictor": lambda model_dir: _train_rate_model(model_dir),
+}
+
+
+def load_all_models():
+    """Check the shared model files exist; models are loaded on first use, never trained here"""
+    model_dir = get_registry().model_dir
+    missing = [name for name in _TRAINERS if not os.path.exists(os.path.join(model_dir, f"{name}.joblib"))]
+    for name in missing:
+        print(f"  [WARN] {name}.joblib not found in {model_dir}; run `python -m services.model_loader` "
+              f"(predictions fall back to heuristics)")
 
     # Note: Dust prediction uses a physics-based soiling model (see dust_monitoring.py)
     # backed by IEA PVPS Task 13 research — no ML model needed.
 
-    print(f"  [OK] Loaded {len(_models)} model(s)")
+    print(f"  [OK] Model registry ready ({model_dir})")
 
 
-def get_model(name: str):
-    """Get a loaded model by name"""
-    return _models.get(name)
+def build_models(model_dir: str, force: bool = False) -> list:
+    """Train and save every shared model whose file is missing (or all with force)"""
+    os.makedirs(model_dir, exist_ok=True)
+    built = []
+    for name, train in _TRAINERS.items():
+        if force or not os.path.exists(os.path.join(model_dir, f"{name}.joblib")):
+            train(model_dir)
+            built.append(name)
+    return built
+
+
+def get_model(name: str, region=None):
+    """Get a model by name, preferring the region-specific one"""
+    return get_registry().get(name, region)
+
+
+def get_model_version(name: str, region=None):
+    """Version stamp of the model get_model would return, None if there is none"""
+    return get_registry().version(name, region)
+
+
+def get_model_with_version(name: str, region=None):
+    """(model, version stamp) resolved together; use when the version keys cached output"""
+    return get_registry().lookup(name, region)
 
 
 def _train_rate_model(model_dir: str):
     """Train electricity rate prediction model"""
+    import joblib
+    import numpy as np
+    from sklearn.linear_model import LinearRegression
     np.random.seed(42)
 
     # Historical electricity rates (India, INR/kWh, 2010-2024)
@@ -45,3 +207,16 @@ def _train_rate_model(model_dir: str):
     joblib.dump(model, os.path.join(model_dir, "rate_predictor.joblib"))
     print("  [OK] Trained and saved rate prediction model")
     return model
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the AI service's shared models")
+    parser.add_argument("--model-dir", default=get_settings().MODEL_DIR)
+    parser.add_argument("--force", action="store_true", help="retrain even if the model file exists")
+    args = parser.parse_args(argv)
+    built = build_models(args.model_dir, args.force)
+    print(f"Built {len(built)} model(s) in {args.model_dir}: {', '.join(built) or 'all up to date'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import base64
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Grid phase shifts tried per axis, as fractions of the panel pitch
+GRID_OFFSETS = 4
+
+
+class PackedLayout(NamedTuple):
+    """Panel lower-left corners (metres, from the roof bounding box origin) on one grid"""
+    x: np.ndarray
+    y: np.ndarray
+    row: np.ndarray
+    col: np.ndarray
+    width: float
+    height: float
+    orientation: str
+    row_spacing: float
+    col_spacing: float
+
+    @property
+    def count(self) -> int:
+        return int(self.x.size)
+
+
+def rectangle_polygon(area: float, aspect: float = 1.5) -> np.ndarray:
+    """Axis-aligned rectangle of the given area and width:height aspect"""
+    width = np.sqrt(area * aspect)
+    height = area / width
+    return np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float64)
+
+
+def polygon_area(polygon: np.ndarray) -> float:
+    x, y = polygon[:, 0], polygon[:, 1]
+    return float(abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2)
+
+
+def scale_polygon(polygon: Sequence[Sequence[float]], area: float) -> np.ndarray:
+    """
+    Roof polygon in metres with its bounding box at the origin. Polygons in
+    normalized image coordinates (every vertex within [0, 1], as produced by
+    roof analysis) are scaled uniformly so they enclose `area` square metres.
+    """
+    poly = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    if len(poly) < 3 or polygon_area(poly) <= 0:
+        raise ValueError("roof polygon needs at least three non-collinear vertices")
+    poly = poly - poly.min(axis=0)
+    if poly.max() <= 1.0:
+        poly *= np.sqrt(area / polygon_area(poly))
+    return poly
+
+
+def obstruction_rects(obstructions: Iterable[dict], extent: np.ndarray) -> np.ndarray:
+    """
+    (n, 4) array of x0, y0, x1, y1 keep-out rectangles in metres. Positions
+    are normalized centres within the roof bounding box; obstructions without
+    explicit width/height are taken as squares of their area.
+    """
+    rects = []
+    for obs in obstructions:
+        pos = obs.get("position") or {}
+        area = float(obs.get("area") or 0)
+        w = float(pos.get("width") or np.sqrt(area))
+        h = float(pos.get("height") or np.sqrt(area))
+        if w <= 0 or h <= 0:
+            continue
+        cx = float(pos.get("x", 0.5)) * extent[0]
+        cy = float(pos.get("y", 0.5)) * extent[1]
+        rects.append((cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2))
+    return np.array(rects, dtype=np.float64).reshape(-1, 4)
+
+
+def points_in_polygon(px: np.ndarray, py: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """Even-odd ray casting over whole point arrays, one pass per polygon edge"""
+    inside = np.zeros(px.shape, dtype=bool)
+    x0, y0 = polygon[:, 0], polygon[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    for ax, ay, bx, by in zip(x0, y0, x1, y1):
+        if ay == by:
+            continue
+        crosses = (ay > py) != (by > py)
+        x_cross = ax + (py - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (px < x_cross)
+    return inside
+
+
+def _fits_polygon(x: np.ndarray, y: np.ndarray, w: float, h: float, polygon: np.ndarray) -> np.ndarray:
+    # Shrink by a hair so panels flush against a straight edge count as inside
+    eps = 1e-9
+    ok = np.ones(x.shape, dtype=bool)
+    for dx, dy in ((eps, eps), (w - eps, eps), (w - eps, h - eps), (eps, h - eps)):
+        ok &= points_in_polygon(x + dx, y + dy, polygon)
+    # Corners inside is exact for convex roofs; on concave roofs a notch can
+    # still run through the panel, so also reject panels any edge crosses
+    idx = np.flatnonzero(ok)
+    x0, y0 = x[idx] + eps, y[idx] + eps
+    x1, y1 = x0 + w - 2 * eps, y0 + h - 2 * eps
+    crossed = np.zeros(idx.shape, dtype=bool)
+    for (ax, ay), (bx, by) in zip(polygon, np.roll(polygon, -1, axis=0)):
+        crossed |= _segment_crosses_rects(ax, ay, bx, by, x0, y0, x1, y1)
+    ok[idx[crossed]] = False
+    return ok
+
+
+def _segment_crosses_rects(ax, ay, bx, by, x0, y0, x1, y1) -> np.ndarray:
+    """Liang-Barsky clip of one segment against many open rectangles at once"""
+    t_enter = np.zeros(x0.shape)
+    t_exit = np.ones(x0.shape)
+    for a, d, lo, hi in ((ax, bx - ax, x0, x1), (ay, by - ay, y0, y1)):
+        if d == 0:
+            # Parallel to this axis: the segment is either within the slab or misses it
+            outside = (a <= lo) | (a >= hi)
+            t_exit = np.where(outside, -1.0, t_exit)
+            continue
+        t_lo, t_hi = (lo - a) / d, (hi - a) / d
+        t_enter = np.maximum(t_enter, np.minimum(t_lo, t_hi))
+        t_exit = np.minimum(t_exit, np.maximum(t_lo, t_hi))
+    return t_enter < t_exit
+
+
+def _pack_grid(polygon: np.ndarray, extent: np.ndarray, rects: np.ndarray, w: float, h: float,
+               row_spacing: float, col_spacing: float, off_x: float, off_y: float):
+    pitch_x, pitch_y = w + col_spacing, h + row_spacing
+    cols = int(np.floor((extent[0] - off_x - w) / pitch_x)) + 1
+    rows = int(np.floor((extent[1] - off_y - h) / pitch_y)) + 1
+    if cols <= 0 or rows <= 0:
+        return None
+
+    # The candidate lattice doubles as the spatial index: each obstruction
+    # clears only the block of slots its rectangle overlaps
+    free = np.ones((rows, cols), dtype=bool)
+    for x0, y0, x1, y1 in rects:
+        c0 = max(int(np.floor((x0 - w - off_x) / pitch_x)) + 1, 0)
+        c1 = min(int(np.ceil((x1 - off_x) / pitch_x)) - 1, cols - 1)
+        r0 = max(int(np.floor((y0 - h - off_y) / pitch_y)) + 1, 0)
+        r1 = min(int(np.ceil((y1 - off_y) / pitch_y)) - 1, rows - 1)
+        if c0 <= c1 and r0 <= r1:
+            free[r0:r1 + 1, c0:c1 + 1] = False
+
+    row, col = np.nonzero(free)
+    x = off_x + col * pitch_x
+    y = off_y + row * pitch_y
+    keep = _fits_polygon(x, y, w, h, polygon)
+    return x[keep], y[keep], row[keep], col[keep]
+
+
+def pack_panels(polygon: np.ndarray, obstructions: Optional[List[dict]], panel_width: float,
+                panel_height: float, row_spacing: Dict[str, float], col_spacing: float = 0.1,
+                orientations: Sequence[str] = ("portrait", "landscape")) -> PackedLayout:
+    """
+    Maximum-panel grid layout inside a roof polygon (metres) avoiding
+    obstructions. Every orientation in `orientations` is tried at
+    GRID_OFFSETS x GRID_OFFSETS phase shifts of the panel grid; `row_spacing`
+    gives the inter-row gap per orientation. Ties keep the earlier
+    orientation and the smaller offset.
+    """
+    extent = polygon.max(axis=0)
+    rects = obstruction_rects(obstructions or [], extent)
+    best = None
+    for orientation in orientations:
+        w, h = (panel_width, panel_height) if orientation == "portrait" else (panel_height, panel_width)
+        spacing = row_spacing[orientation]
+        for fx in np.arange(GRID_OFFSETS) / GRID_OFFSETS:
+            for fy in np.arange(GRID_OFFSETS) / GRID_OFFSETS:
+                packed = _pack_grid(polygon, extent, rects, w, h, spacing, col_spacing,
+                                    fx * (w + col_spacing), fy * (h + spacing))
+                if packed is not None and (best is None or packed[0].size > best.count):
+                    x, y, row, col = packed
+                    if x.size:
+                        row, col = row - row.min(), col - col.min()
+                    best = PackedLayout(x, y, row, col, w, h, orientation, spacing, col_spacing)
+    if best is None:
+        empty = np.empty(0)
+        spacing = row_spacing[orientations[0]]
+        best = PackedLayout(empty, empty, empty.astype(int), empty.astype(int),
+                            panel_width, panel_height, orientations[0], spacing, col_spacing)
+    return best
+
+
+def layout_payload(packed: PackedLayout, layout_format: str = "objects"):
+    """
+    Serialize a packed layout.
+
+    - objects: one dict per panel (row, col, x, y, width, height, orientation)
+    - columnar: shared panel dimensions, grid origin and pitch plus parallel
+      row/col arrays; panel (row, col) sits at origin + (col, row) * pitch
+    - binary: as columnar, with the indices as base64 little-endian uint16
+      (row, col) pairs
+    """
+    if layout_format == "objects":
+        x = np.round(packed.x, 2)
+        y = np.round(packed.y, 2)
+        return [
+            {"row": r, "col": c, "x": px, "y": py, "width": packed.width,
+             "height": packed.height, "orientation": packed.orientation}
+            for r, c, px, py in zip(packed.row.tolist(), packed.col.tolist(), x.tolist(), y.tolist())
+        ]
+
+    pitch_x = packed.width + packed.col_spacing
+    pitch_y = packed.height + packed.row_spacing
+    # Panels lie on one lattice, so the corner of cell (0, 0) locates all of them
+    origin_x = float(packed.x[0] - packed.col[0] * pitch_x) if packed.count else 0.0
+    origin_y = float(packed.y[0] - packed.row[0] * pitch_y) if packed.count else 0.0
+    payload = {
+        "format": layout_format,
+        "count": packed.count,
+        "width": packed.width,
+        "height": packed.height,
+        "orientation": packed.orientation,
+        # Unrounded: positions are rebuilt from these, and rounding error grows with the index
+        "origin": {"x": origin_x, "y": origin_y},
+        "pitch": {"x": pitch_x, "y": pitch_y},
+    }
+    if layout_format == "columnar":
+        payload.update(row=packed.row.tolist(), col=packed.col.tolist())
+    else:
+        row_col = np.column_stack([packed.row, packed.col]).astype("<u2")
+        payload.update(encoding="base64", rowCol=base64.b64encode(row_col.tobytes()).decode("ascii"))
+    return payload
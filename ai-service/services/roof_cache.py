@@ -0,0 +1,82 @@
+import hashlib
+import json
+from typing import Optional
+
+from config import get_settings
+from services.cache import TTLCache
+
+
+# Bump when the img_props features change meaning, so shared Redis entries from
+# older builds are not served
+FEATURES_VERSION = 2
+
+
+def roof_cache_key(contents: bytes, max_side: int) -> str:
+    """Content hash of an upload plus the analysis resolution it was measured at"""
+    return f"roof:v{FEATURES_VERSION}:{hashlib.blake2b(contents, digest_size=16).hexdigest()}:{max_side}"
+
+
+class RoofAnalysisCache:
+    """
+    img_props keyed by upload content hash: an in-process LRU in front of an
+    optional Redis tier shared by all workers/containers. Redis failures are
+    logged and treated as misses so analysis never depends on Redis being up.
+    """
+
+    def __init__(self, maxsize: int, redis_url: Optional[str] = None, redis_ttl: int = 0):
+        self.memory = TTLCache(maxsize=maxsize)
+        self.redis_ttl = redis_ttl or None
+        self._redis = None
+        if redis_url:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(redis_url)
+
+    async def get(self, key: str) -> Optional[dict]:
+        props = self.memory.get(key)
+        if props is not None or self._redis is None:
+            return props
+        try:
+            raw = await self._redis.get(key)
+        except Exception as e:
+            print(f"Roof cache Redis error: {e}")
+            return None
+        if raw is None:
+            return None
+        props = json.loads(raw)
+        self.memory.set(key, props)
+        return props
+
+    async def set(self, key: str, props: dict):
+        self.memory.set(key, props)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(key, json.dumps(props), ex=self.redis_ttl)
+        except Exception as e:
+            print(f"Roof cache Redis error: {e}")
+
+    async def aclose(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+
+
+_roof_cache: Optional[RoofAnalysisCache] = None
+
+
+def get_roof_cache() -> RoofAnalysisCache:
+    global _roof_cache
+    if _roof_cache is None:
+        settings = get_settings()
+        _roof_cache = RoofAnalysisCache(
+            maxsize=settings.ROOF_CACHE_MAX_ENTRIES,
+            redis_url=settings.REDIS_URL if settings.ROOF_CACHE_REDIS else None,
+            redis_ttl=settings.ROOF_CACHE_REDIS_TTL,
+        )
+    return _roof_cache
+
+
+async def close_roof_cache():
+    global _roof_cache
+    if _roof_cache is not None:
+        await _roof_cache.aclose()
+        _roof_cache = None
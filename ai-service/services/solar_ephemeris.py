@@ -0,0 +1,74 @@
+import calendar
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+
+class YearTables(NamedTuple):
+    """Per-day solar quantities for one calendar year (index 0 = 1 January)"""
+    year: int
+    declination: np.ndarray  # radians
+    sin_declination: np.ndarray
+    cos_declination: np.ndarray
+    tan_declination: np.ndarray
+    equation_of_time: np.ndarray  # minutes
+    month: np.ndarray  # 0-11
+
+
+@lru_cache(maxsize=16)
+def year_tables(year: int) -> YearTables:
+    """
+    Declination and equation of time for every day of `year` (Spencer 1971
+    Fourier series), computed once per year. Arrays are read-only so cached
+    tables can be shared safely between requests.
+    """
+    days = 366 if calendar.isleap(year) else 365
+    b = 2 * np.pi * np.arange(days) / days
+    decl = (0.006918 - 0.399912 * np.cos(b) + 0.070257 * np.sin(b)
+            - 0.006758 * np.cos(2 * b) + 0.000907 * np.sin(2 * b)
+            - 0.002697 * np.cos(3 * b) + 0.00148 * np.sin(3 * b))
+    eot = 229.18 * (0.000075 + 0.001868 * np.cos(b) - 0.032077 * np.sin(b)
+                    - 0.014615 * np.cos(2 * b) - 0.040849 * np.sin(2 * b))
+    dates = np.arange(f"{year}-01-01", f"{year + 1}-01-01", dtype="datetime64[D]")
+    month = dates.astype("datetime64[M]").astype(np.int64) % 12
+
+    tables = YearTables(year, decl, np.sin(decl), np.cos(decl), np.tan(decl), eot, month)
+    for arr in tables[1:]:
+        arr.flags.writeable = False
+    return tables
+
+
+def nominal_utc_offset(lng: float) -> float:
+    """Time-zone offset (hours) of the nominal meridian nearest a longitude"""
+    return float(round(lng / 15))
+
+
+def solar_time(clock_hour, day_index, lng: float, year: int, utc_offset: Optional[float] = None) -> np.ndarray:
+    """Local apparent solar time (hours) for local clock hours on the given days"""
+    if utc_offset is None:
+        utc_offset = nominal_utc_offset(lng)
+    eot = year_tables(year).equation_of_time[day_index]
+    return np.asarray(clock_hour, dtype=np.float64) + (4 * (lng - 15 * utc_offset) + eot) / 60
+
+
+def solar_position(lat, day_index, solar_hour, year: int):
+    """
+    Solar altitude and azimuth (degrees) from the cached tables of `year`.
+    `lat`, `day_index` (0-based) and `solar_hour` (apparent solar time) broadcast
+    against each other, so a column of days and a row of hours yields the full
+    (days x hours) grid in one shot. Azimuth is measured clockwise from north.
+    """
+    tables = year_tables(year)
+    sin_d = tables.sin_declination[day_index]
+    cos_d = tables.cos_declination[day_index]
+    tan_d = tables.tan_declination[day_index]
+    phi = np.radians(np.asarray(lat, dtype=np.float64))
+    sin_phi, cos_phi = np.sin(phi), np.cos(phi)
+    hour_angle = np.radians((np.asarray(solar_hour, dtype=np.float64) - 12.0) * 15)
+    cos_h = np.cos(hour_angle)
+
+    sin_alt = sin_phi * sin_d + cos_phi * cos_d * cos_h
+    altitude = np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+    azimuth = (np.degrees(np.arctan2(np.sin(hour_angle), cos_h * sin_phi - tan_d * cos_phi)) + 180.0) % 360.0
+    return altitude, azimuth
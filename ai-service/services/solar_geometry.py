@@ -0,0 +1,53 @@
+from functools import lru_cache
+
+import numpy as np
+
+from services.solar_ephemeris import solar_position, year_tables
+
+# Latitude resolution (degrees) at which full-year profiles are cached
+LAT_TILE_DEG = 0.1
+
+
+def shadow_factor(altitude: np.ndarray) -> np.ndarray:
+    """Fraction of roof area shaded at a given sun altitude (0.3 at the horizon, 0 overhead)"""
+    return np.maximum(0, 1 - np.maximum(altitude, 0) / 90) * 0.3
+
+
+def clear_sky_irradiance(altitude: np.ndarray) -> np.ndarray:
+    """Simple clear-sky plane irradiance (W/m²) from sun altitude"""
+    return np.maximum(0, np.sin(np.radians(altitude))) * 1000 * 0.85
+
+
+@lru_cache(maxsize=1024)
+def _annual_shadow_profile(lat_tile: float, year: int, step_minutes: int) -> dict:
+    tables = year_tables(year)
+    days = np.arange(tables.declination.size)[:, None]
+    hours = np.arange(0, 24 * 60, step_minutes, dtype=np.float64)[None, :] / 60.0 + step_minutes / 120.0
+
+    # Integrated over whole days the clock/solar time offset only shifts the
+    # sampling phase, so the grid runs in solar time and ignores longitude
+    altitude, _ = solar_position(lat_tile, days, hours, year)
+    irradiance = clear_sky_irradiance(altitude)
+    shaded = shadow_factor(altitude) * irradiance
+
+    # Irradiance-weighted loss: a shaded low sun costs less energy than a shaded noon sun
+    daily_shaded = shaded.sum(axis=1)
+    daily_irradiance = irradiance.sum(axis=1)
+    monthly_shaded = np.bincount(tables.month, weights=daily_shaded, minlength=12)
+    monthly_irradiance = np.bincount(tables.month, weights=daily_irradiance, minlength=12)
+    monthly_loss = monthly_shaded / np.maximum(monthly_irradiance, 1e-9)
+
+    return {
+        "monthlyShadowLoss": [round(float(v) * 100, 1) for v in monthly_loss],
+        "annualShadowLoss": round(float(daily_shaded.sum() / max(daily_irradiance.sum(), 1e-9)) * 100, 1),
+        "daylightHours": round(float((altitude > 0).sum() * step_minutes / 60 / days.size), 2),
+    }
+
+
+def annual_shadow_profile(lat: float, year: int, step_minutes: int = 60) -> dict:
+    """
+    Monthly and annual shadow loss (%) over every time step of a year, computed
+    as one (days x steps) NumPy broadcast and cached per (latitude tile, year).
+    """
+    lat_tile = round(round(lat / LAT_TILE_DEG) * LAT_TILE_DEG, 4)
+    return _annual_shadow_profile(lat_tile, year, int(step_minutes))
@@ -0,0 +1,312 @@
+"""
+Per-request stage timings.
+
+Routers wrap the interesting stages in `span("decode")`, `span("fetch_weather")`,
+... When TRACING_ENABLED is set, TracingMiddleware opens a trace for every
+request, the response carries a `Server-Timing` header with the time spent in
+each stage, and with TRACE_EXPORT_PATH set the spans are appended to that file
+as OTLP/JSON lines (the OpenTelemetry Collector file-exporter format) by a
+background writer thread. When
+tracing is off, `span()` returns a shared no-op after one ContextVar lookup.
+
+Worker pools do not inherit the request context; jobs run under `capture()`
+and return their spans, which the request merges back with `merge()`.
+"""
+import json
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional, Tuple
+
+from config import get_settings
+from services.metrics import route_template
+
+# (span_id, parent_span_id, name, start_unix_ns, end_unix_ns)
+SpanRecord = Tuple[int, Optional[int], str, int, int]
+
+# (trace, id of the innermost open span) for the running request, None when not tracing
+_active: ContextVar[Optional[tuple]] = ContextVar("smartsolar_trace", default=None)
+
+
+def _new_id(bits: int = 64) -> int:
+    return random.getrandbits(bits) or 1
+
+
+class Trace:
+    __slots__ = ("trace_id", "root_id", "parent_id", "spans")
+
+    def __init__(self, trace_id: Optional[int] = None, parent_id: Optional[int] = None):
+        self.trace_id = trace_id or _new_id(128)
+        self.root_id = _new_id()
+        self.parent_id = parent_id  # caller's span, from an incoming traceparent header
+        self.spans: List[SpanRecord] = []
+
+
+class _Span:
+    __slots__ = ("trace", "parent", "name", "span_id", "token", "start", "t0")
+
+    def __init__(self, trace: Trace, parent: Optional[int], name: str):
+        self.trace = trace
+        self.parent = parent
+        self.name = name
+        self.span_id = _new_id()
+
+    def __enter__(self):
+        self.token = _active.set((self.trace, self.span_id))
+        self.start = time.time_ns()
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = self.start + time.perf_counter_ns() - self.t0
+        _active.reset(self.token)
+        self.trace.spans.append((self.span_id, self.parent, self.name, self.start, end))
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name: str):
+    """Time a stage of the current request: `with span("canny"): ...`"""
+    active = _active.get()
+    if active is None:
+        return _NOOP
+    return _Span(active[0], active[1], name)
+
+
+def is_active() -> bool:
+    return _active.get() is not None
+
+
+@contextmanager
+def capture(enabled: bool = True):
+    """
+    Record spans inside a pool worker. Yields the list the spans are appended
+    to; return it to the request and pass it to merge(). With enabled=False
+    nothing is recorded and the list stays empty.
+    """
+    if not enabled:
+        yield []
+        return
+    trace = Trace()
+    token = _active.set((trace, None))
+    try:
+        yield trace.spans
+    finally:
+        _active.reset(token)
+
+
+def merge(spans) -> None:
+    """Attach spans recorded by capture() under the current span"""
+    active = _active.get()
+    if active is None or not spans:
+        return
+    trace, parent = active
+    parent = parent or trace.root_id
+    trace.spans.extend((sid, pid or parent, name, start, end) for sid, pid, name, start, end in spans)
+
+
+def server_timing(trace: Trace, total_ms: float) -> str:
+    """Server-Timing value: stages summed by name in first-seen order, then the total"""
+    totals = {}
+    for _, _, name, start, end in trace.spans:
+        dur, count = totals.get(name, (0, 0))
+        totals[name] = (dur + end - start, count + 1)
+    parts = []
+    for name, (dur, count) in totals.items():
+        entry = f"{name};dur={dur / 1e6:.1f}"
+        parts.append(entry + f';desc="x{count}"' if count > 1 else entry)
+    parts.append(f"total;dur={total_ms:.1f}")
+    return ", ".join(parts)
+
+
+def _parse_traceparent(value: str):
+    """W3C traceparent (00-<trace id>-<parent id>-<flags>) -> (trace_id, parent_id) or (None, None)"""
+    try:
+        _, trace_id, parent_id, _ = value.split("-")
+        return int(trace_id, 16) or None, int(parent_id, 16) or None
+    except ValueError:
+        return None, None
+
+
+# ---------- OTLP/JSON file export ----------
+
+def _attr(key: str, value) -> dict:
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+_STOP = object()
+
+
+class SpanFileExporter:
+    """
+    Appends one OTLP ExportTraceServiceRequest JSON document per request.
+
+    export() only queues the finished trace; a writer thread encodes the
+    queued traces and writes them in batches, one flush per batch. When
+    the queue is full, traces are dropped (counted in `dropped`) rather
+    than slowing requests down.
+    """
+
+    def __init__(self, path: str, service_name: str = "smartsolar-ai", max_queue: int = 10000):
+        self.path = path
+        self.resource = {"attributes": [_attr("service.name", service_name)]}
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def export(self, trace: Trace, start_ns: int, end_ns: int, attributes: dict):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._write_loop, name="span-exporter", daemon=True)
+                    self._thread.start()
+        try:
+            self._queue.put_nowait((trace, start_ns, end_ns, attributes))
+        except queue.Full:
+            self.dropped += 1
+
+    def _document(self, trace: Trace, start_ns: int, end_ns: int, attributes: dict) -> str:
+        root = {
+            "traceId": f"{trace.trace_id:032x}",
+            "spanId": f"{trace.root_id:016x}",
+            "name": f"{attributes.get('http.method', '')} {attributes.get('http.route', '')}".strip(),
+            "kind": 2,  # SPAN_KIND_SERVER
+            "startTimeUnixNano": str(start_ns),
+            "endTimeUnixNano": str(end_ns),
+            "attributes": [_attr(k, v) for k, v in attributes.items()],
+        }
+        if trace.parent_id:
+            root["parentSpanId"] = f"{trace.parent_id:016x}"
+        spans = [root] + [
+            {
+                "traceId": root["traceId"],
+                "spanId": f"{sid:016x}",
+                "parentSpanId": f"{pid or trace.root_id:016x}",
+                "name": name,
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(start),
+                "endTimeUnixNano": str(end),
+            }
+            for sid, pid, name, start, end in trace.spans
+        ]
+        return json.dumps({"resourceSpans": [{
+            "resource": self.resource,
+            "scopeSpans": [{"scope": {"name": "smartsolar-ai.tracing"}, "spans": spans}],
+        }]}, separators=(",", ":"))
+
+    def _write_loop(self):
+        fh = None
+        try:
+            while True:
+                # Block for one trace, then take whatever else has queued up meanwhile
+                batch = [self._queue.get()]
+                while True:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                lines = [self._document(*item) + "\n" for item in batch if item is not _STOP]
+                if lines:
+                    try:
+                        if fh is None:
+                            fh = open(self.path, "a", encoding="utf-8")
+                        fh.writelines(lines)
+                        fh.flush()
+                    except OSError as e:
+                        self.dropped += len(lines)
+                        print(f"  [WARN] Span export to {self.path} failed: {e}")
+                if len(lines) < len(batch):
+                    return
+        finally:
+            if fh is not None:
+                fh.close()
+
+    def close(self):
+        """Write out everything queued so far and stop the writer thread"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join(timeout=5)
+
+
+_exporter: Optional[SpanFileExporter] = None
+
+
+def get_span_exporter() -> Optional[SpanFileExporter]:
+    """File exporter for TRACE_EXPORT_PATH, None when export is not configured"""
+    global _exporter
+    path = get_settings().TRACE_EXPORT_PATH
+    if _exporter is None and path:
+        _exporter = SpanFileExporter(path)
+    return _exporter
+
+
+def close_span_exporter():
+    global _exporter
+    if _exporter is not None:
+        _exporter.close()
+    _exporter = None
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a trace per request and adding the Server-Timing header"""
+
+    def __init__(self, app):
+        self.app = app
+        self.enabled = get_settings().TRACING_ENABLED
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace_id, parent_id = None, None
+        for key, value in scope["headers"]:
+            if key == b"traceparent":
+                trace_id, parent_id = _parse_traceparent(value.decode("latin-1"))
+                break
+        trace = Trace(trace_id, parent_id)
+        token = _active.set((trace, trace.root_id))
+        start_ns = time.time_ns()
+        t0 = time.perf_counter_ns()
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                total_ms = (time.perf_counter_ns() - t0) / 1e6
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(trace, total_ms).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _active.reset(token)
+            exporter = get_span_exporter()
+            if exporter is not None:
+                exporter.export(trace, start_ns, start_ns + time.perf_counter_ns() - t0, {
+                    "http.method": scope["method"],
+                    "http.route": route_template(scope),
+                    "http.status_code": status["code"],
+                })
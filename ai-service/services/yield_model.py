@@ -0,0 +1,123 @@
+"""
+Hourly PV yield over a typical year.
+
+Monthly NASA POWER climatology (daily GHI and, when available, 2 m air
+temperature) is expanded to 8760 hourly values: each day's GHI follows the
+extraterrestrial profile at a constant clearness index, is split into beam
+and diffuse with the Erbs correlation, transposed onto the panel plane with
+the isotropic-sky model and derated for cell temperature (NOCT model).
+Results are memoized per (grid cell, tilt, azimuth).
+"""
+from functools import lru_cache
+from typing import Optional, Sequence
+
+import numpy as np
+
+from services.irradiance_store import GRID_LAT_DEG, grid_cell
+from services.solar_ephemeris import solar_position, year_tables
+
+# Any non-leap year gives the 365 x 24 typical-year grid
+TYPICAL_YEAR = 2023
+
+SOLAR_CONSTANT = 1367.0  # W/m²
+GROUND_ALBEDO = 0.2
+NOCT = 45.0  # °C at 800 W/m², 20 °C ambient
+TEMP_COEFFICIENT = -0.004  # power change per °C above 25 °C
+DIURNAL_SWING = 5.0  # °C either side of the monthly mean, peaking mid-afternoon
+
+ORIENTATION_AZIMUTH = {
+    "north": 0, "northeast": 45, "east": 90, "southeast": 135,
+    "south": 180, "southwest": 225, "west": 270, "northwest": 315,
+}
+
+
+def orientation_azimuth(orientation: Optional[str], default: float) -> float:
+    """
+    Compass azimuth (degrees clockwise from north) for a roof orientation name.
+    None, "auto" or an unknown name gives `default` (pass the equator-facing azimuth).
+    """
+    key = (orientation or "").lower().replace("-", "").replace("_", "").replace(" ", "")
+    return float(ORIENTATION_AZIMUTH.get(key, default))
+
+
+def estimate_monthly_temperature(lat: float) -> list:
+    """Rough monthly mean air temperature (°C) when NASA T2M is unavailable"""
+    mean = 28 - 0.006 * lat * lat
+    amplitude = min(12.0, 0.3 * abs(lat))
+    phase = 0 if lat >= 0 else 6  # coldest month: January north, July south
+    return [round(mean - amplitude * np.cos(2 * np.pi * ((m - phase) % 12) / 12), 1) for m in range(12)]
+
+
+def _erbs_diffuse_fraction(kt: np.ndarray) -> np.ndarray:
+    return np.select(
+        [kt <= 0.22, kt <= 0.80],
+        [1 - 0.09 * kt, 0.9511 - 0.1604 * kt + 4.388 * kt ** 2 - 16.638 * kt ** 3 + 12.336 * kt ** 4],
+        default=0.165,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _hourly_yield(lat: float, tilt: float, azimuth: float,
+                  monthly_ghi: tuple, monthly_temp: tuple) -> dict:
+    tables = year_tables(TYPICAL_YEAR)
+    days = np.arange(tables.declination.size)[:, None]
+    hours = np.arange(24)[None, :] + 0.5
+
+    altitude, sun_azimuth = solar_position(lat, days, hours, TYPICAL_YEAR)
+    sin_alt = np.maximum(np.sin(np.radians(altitude)), 0)
+
+    # Horizontal extraterrestrial irradiance and each day's clearness index
+    eccentricity = 1 + 0.033 * np.cos(2 * np.pi * (days + 1) / 365)
+    extraterrestrial = SOLAR_CONSTANT * eccentricity * sin_alt
+    daily_extraterrestrial = extraterrestrial.sum(axis=1, keepdims=True)
+    daily_ghi = np.asarray(monthly_ghi)[tables.month][:, None] * 1000  # Wh/m²/day
+    clearness = np.clip(np.divide(daily_ghi, daily_extraterrestrial,
+                                  out=np.zeros_like(daily_ghi), where=daily_extraterrestrial > 0), 0, 0.85)
+    ghi = extraterrestrial * clearness
+
+    # Beam/diffuse split; near the horizon all light is treated as diffuse
+    dhi = np.where(sin_alt > 0.02, _erbs_diffuse_fraction(np.broadcast_to(clearness, ghi.shape)) * ghi, ghi)
+    dni = np.divide(ghi - dhi, sin_alt, out=np.zeros_like(ghi), where=sin_alt > 0.02)
+
+    beta = np.radians(tilt)
+    cos_aoi = (sin_alt * np.cos(beta)
+               + np.cos(np.radians(altitude)) * np.sin(beta) * np.cos(np.radians(sun_azimuth - azimuth)))
+    poa = (dni * np.maximum(cos_aoi, 0)
+           + dhi * (1 + np.cos(beta)) / 2
+           + ghi * GROUND_ALBEDO * (1 - np.cos(beta)) / 2)
+
+    ambient = np.asarray(monthly_temp)[tables.month][:, None] + DIURNAL_SWING * np.cos(2 * np.pi * (hours - 15) / 24)
+    cell_temp = ambient + poa / 800 * (NOCT - 20)
+    derate = np.maximum(0, 1 + TEMP_COEFFICIENT * (cell_temp - 25))
+
+    dc = poa * derate / 1000  # kWh per kWp per hour
+    monthly_yield = np.bincount(tables.month, weights=dc.sum(axis=1), minlength=12)
+    poa_total = poa.sum()
+    return {
+        "annualYield": float(dc.sum()),
+        "monthlyYield": monthly_yield.tolist(),
+        "planeOfArrayPeakSunHours": float(poa_total / 1000 / days.size),
+        "temperatureLoss": float(1 - (poa * derate).sum() / poa_total) if poa_total > 0 else 0.0,
+    }
+
+
+def hourly_yield(lat: float, lng: float, tilt: float, azimuth: float,
+                 monthly_ghi: Sequence[float], monthly_temp: Optional[Sequence[float]] = None) -> dict:
+    """
+    DC yield per kWp before system losses: annualYield and monthlyYield (kWh/kWp),
+    planeOfArrayPeakSunHours and temperatureLoss (fraction). Memoized on the
+    NASA POWER grid cell of the site, tilt (0.5°) and azimuth (1°).
+    Raises ValueError unless monthly_ghi has exactly 12 values (Jan..Dec).
+    """
+    if len(monthly_ghi) != 12:
+        raise ValueError(f"monthly_ghi needs 12 monthly values, got {len(monthly_ghi)}")
+    lat_idx, _ = grid_cell(lat, lng)
+    cell_lat = max(-89.75, min(89.75, lat_idx * GRID_LAT_DEG - 90.0))
+    temps = monthly_temp if monthly_temp and len(monthly_temp) == 12 else estimate_monthly_temperature(cell_lat)
+    return _hourly_yield(
+        cell_lat,
+        round(tilt * 2) / 2,
+        float(round(azimuth) % 360),
+        tuple(float(v) for v in monthly_ghi),
+        tuple(float(v) for v in temps),
+    )
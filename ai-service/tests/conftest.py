@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Service modules are imported top-level (config, routers, services), as uvicorn does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import app
+from routers import dust_monitoring
+
+WEATHER = {"temperature": 32.0, "humidity": 40, "windSpeed": 6.0, "pm10": 120.0, "pm25": 60.0, "aqi": 150,
+           "source": "open-meteo"}
+
+
+@pytest.fixture(autouse=True)
+def offline_weather(monkeypatch):
+    async def fake_fetch(lat, lng):
+        return dict(WEATHER)
+    monkeypatch.setattr(dust_monitoring, "fetch_weather_data", fake_fetch)
+
+
+def test_invalid_site_gets_its_own_error_line():
+    sites = [
+        {"site_id": "ok-1", "lat": 31.5, "lng": 74.3},
+        {"site_id": "bad-lat", "lat": 291.5, "lng": 74.3},
+        {"site_id": "ok-2", "lat": 24.9, "lng": 67.0, "days_since_cleaning": 30},
+        {"lat": 24.9, "lng": 67.0},
+    ]
+    response = TestClient(app).post("/ai/dust/current/batch", json={"sites": sites})
+    assert response.status_code == 200
+    results = {r["siteId"]: r for r in map(json.loads, response.text.splitlines())}
+    assert len(results) == 4
+    assert results["ok-1"]["success"] and results["ok-2"]["success"]
+    assert not results["bad-lat"]["success"] and results["bad-lat"]["error"].startswith("lat:")
+    assert not results[None]["success"] and "site_id" in results[None]["error"]
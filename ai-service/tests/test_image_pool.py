@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.image_pool import BoundedPool, PoolSaturatedError
+
+
+def test_cancelled_request_keeps_its_slot_until_the_job_finishes():
+    pool = BoundedPool(workers=1, max_queue=0)
+    started, release = threading.Event(), threading.Event()
+
+    def job():
+        started.set()
+        release.wait(5)
+        return "done"
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(job))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The job is still running, so the pool is still full
+        assert pool.pending == 1
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(job)
+        release.set()
+
+    try:
+        asyncio.run(scenario())
+        for _ in range(100):
+            if pool.pending == 0:
+                break
+            time.sleep(0.01)
+        assert pool.pending == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+def test_pending_returns_to_zero_after_jobs():
+    pool = BoundedPool(workers=2, max_queue=2)
+
+    async def scenario():
+        return await asyncio.gather(*(pool.run(pow, 2, n) for n in range(4)))
+
+    try:
+        assert asyncio.run(scenario()) == [1, 2, 4, 8]
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
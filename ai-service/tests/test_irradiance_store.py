@@ -0,0 +1,43 @@
+import pytest
+
+from services.irradiance_store import summarize_power_monthly
+from services.yield_model import hourly_yield
+
+
+def _series(values_by_month: dict, years=(2020, 2021)) -> dict:
+    series = {}
+    for year in years:
+        for month, value in values_by_month.items():
+            series[f"{year}{month:02d}"] = value
+        series[f"{year}13"] = 99.0  # POWER's annual value, not a month
+    return series
+
+
+def test_monthly_values_are_keyed_by_calendar_month():
+    payload = summarize_power_monthly(_series({m: float(m) for m in range(1, 13)}))
+    assert payload["monthlyValues"] == [float(m) for m in range(1, 13)]
+    assert payload["annualAverage"] == 6.5
+
+
+def test_polar_night_zeros_keep_their_months():
+    values = {m: (0.0 if m in (11, 12, 1) else 3.0) for m in range(1, 13)}
+    payload = summarize_power_monthly(_series(values))
+    assert len(payload["monthlyValues"]) == 12
+    assert payload["monthlyValues"][0] == 0.0 and payload["monthlyValues"][6] == 3.0
+
+
+def test_months_missing_in_one_year_are_filled_from_the_others():
+    series = _series({m: 5.0 for m in range(1, 13)}, years=(2020,))
+    series.update({"202101": 7.0, "202102": -999.0})
+    payload = summarize_power_monthly(series)
+    assert payload["monthlyValues"][:2] == [6.0, 5.0]
+
+
+def test_incomplete_series_is_rejected():
+    assert summarize_power_monthly(_series({m: 5.0 for m in range(1, 11)})) is None
+    assert summarize_power_monthly({}) is None
+
+
+def test_hourly_yield_rejects_short_series():
+    with pytest.raises(ValueError):
+        hourly_yield(28.6, 77.2, 20.0, 180.0, [1.0] * 10)
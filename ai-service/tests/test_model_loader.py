@@ -0,0 +1,55 @@
+import os
+import time
+
+import joblib
+import pytest
+
+from services.model_loader import ModelRegistry
+
+
+@pytest.fixture
+def registry(tmp_path):
+    joblib.dump({"region": "default"}, tmp_path / "rate_predictor.joblib")
+    joblib.dump({"region": "punjab"}, tmp_path / "rate_predictor_punjab.joblib")
+    return ModelRegistry(str(tmp_path), reload_interval=0)
+
+
+def test_regions_without_a_file_share_the_default_entry(registry):
+    for i in range(100):
+        assert registry.get("rate_predictor", f"Region {i}") == {"region": "default"}
+    assert registry.get("rate_predictor", " Punjab ") == {"region": "punjab"}
+    assert sorted(registry.loaded()) == ["rate_predictor:default", "rate_predictor:punjab"]
+
+
+def test_removed_region_file_falls_back_to_default(registry, tmp_path):
+    registry.get("rate_predictor", "Punjab")
+    (tmp_path / "rate_predictor_punjab.joblib").unlink()
+    registry.reload()
+    assert registry.get("rate_predictor", "Punjab") == {"region": "default"}
+    assert list(registry.loaded()) == ["rate_predictor:default"]
+
+
+def test_lookup_returns_model_and_version_from_one_entry(registry):
+    model, version = registry.lookup("rate_predictor", "Punjab")
+    assert model == {"region": "punjab"}
+    assert version.startswith("rate_predictor_punjab.joblib@")
+    assert registry.lookup("rate_predictor", "Sindh")[1].startswith("rate_predictor.joblib@")
+
+
+def test_zero_interval_never_rechecks_until_reload(registry, tmp_path):
+    assert registry.get("rate_predictor") == {"region": "default"}
+    joblib.dump({"region": "retrained"}, tmp_path / "rate_predictor.joblib")
+    assert registry.get("rate_predictor") == {"region": "default"}
+    registry.reload()
+    assert registry.get("rate_predictor") == {"region": "retrained"}
+
+
+def test_positive_interval_picks_up_changed_files(tmp_path):
+    joblib.dump({"v": 1}, tmp_path / "rate_predictor.joblib")
+    registry = ModelRegistry(str(tmp_path), reload_interval=1e-6)
+    assert registry.get("rate_predictor") == {"v": 1}
+    time.sleep(0.01)
+    joblib.dump({"v": 2}, tmp_path / "rate_predictor.joblib")
+    os.utime(tmp_path / "rate_predictor.joblib", ns=(time.time_ns(), time.time_ns() + 10**9))
+    time.sleep(0.01)
+    assert registry.get("rate_predictor") == {"v": 2}
@@ -0,0 +1,51 @@
+import base64
+import json
+
+import numpy as np
+import pytest
+
+from routers.panel_placement import bin_pack_panels
+from services.panel_packing import pack_panels
+
+L_ROOF = [[0, 0], [1, 0], [1, 0.55], [0.6, 0.55], [0.6, 1], [0, 1]]
+OBSTRUCTIONS = [{"type": "water_tank", "area": 9.0, "position": {"x": 0.3, "y": 0.3}}]
+
+
+def _pack(layout_format: str, area: float = 2000.0):
+    layout, _, _, packed = bin_pack_panels(area, 1.0, 2.0, 1.5, roof_polygon=L_ROOF, obstructions=OBSTRUCTIONS,
+                                           landscape_row_spacing=0.8, layout_format=layout_format)
+    return layout, packed
+
+
+def _grid_indices(layout: dict):
+    if layout["format"] == "columnar":
+        return np.array(layout["row"]), np.array(layout["col"])
+    row_col = np.frombuffer(base64.b64decode(layout["rowCol"]), dtype="<u2").reshape(-1, 2)
+    return row_col[:, 0], row_col[:, 1]
+
+
+@pytest.mark.parametrize("layout_format", ["columnar", "binary"])
+def test_compact_layouts_rebuild_panel_positions(layout_format):
+    layout, packed = _pack(layout_format)
+    row, col = _grid_indices(layout)
+    assert layout["count"] == packed.count == row.size
+    np.testing.assert_allclose(layout["origin"]["x"] + col * layout["pitch"]["x"], packed.x, atol=1e-9)
+    np.testing.assert_allclose(layout["origin"]["y"] + row * layout["pitch"]["y"], packed.y, atol=1e-9)
+
+
+@pytest.mark.parametrize("layout_format", ["columnar", "binary"])
+def test_compact_layouts_are_a_tenth_of_objects(layout_format):
+    objects = len(json.dumps(_pack("objects")[0]))
+    assert len(json.dumps(_pack(layout_format)[0])) * 10 < objects
+
+
+@pytest.mark.parametrize("slot", [0.4, 0.6, 0.8])
+@pytest.mark.parametrize("orientation", ["portrait", "landscape"])
+def test_panels_never_straddle_a_narrow_slot(slot, orientation):
+    # 10 x 6 m U-shaped roof: a slot narrower than a panel runs down from the top to y = 1
+    left, right = 5 - slot / 2, 5 + slot / 2
+    roof = np.array([[0, 0], [10, 0], [10, 6], [right, 6], [right, 1], [left, 1], [left, 6], [0, 6]], dtype=float)
+    packed = pack_panels(roof, None, 1.0, 2.0, {"portrait": 0.3, "landscape": 0.3}, 0.1, (orientation,))
+    assert packed.count > 0
+    across = (packed.x < right) & (packed.x + packed.width > left) & (packed.y + packed.height > 1)
+    assert not across.any()
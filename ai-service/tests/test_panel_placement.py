@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from pydantic import ValidationError
+
+from routers import panel_placement
+from schemas.models import MAX_ROOF_AREA, PanelPlacementRequest, PanelSweepRequest
+
+SYDNEY = {"lat": -33.87, "lng": 151.21, "usable_area": 60}
+IRRADIANCE = {
+    "annualAverage": 4.8,
+    "monthlyValues": [6.6, 5.7, 4.8, 3.7, 2.8, 2.4, 2.6, 3.4, 4.6, 5.6, 6.3, 6.7],
+    "peakSunHours": 4.8,
+    "source": "NASA POWER API",
+}
+
+
+@pytest.fixture(autouse=True)
+def offline_irradiance(monkeypatch):
+    async def fake_fetch(lat, lng):
+        return dict(IRRADIANCE)
+    monkeypatch.setattr(panel_placement, "fetch_solar_irradiance", fake_fetch)
+
+
+def _annual(**fields) -> float:
+    request = PanelPlacementRequest(**SYDNEY, **fields)
+    result = asyncio.run(panel_placement.optimal_panel_placement(request))
+    return result["data"]["estimatedAnnualProduction"]
+
+
+def test_default_orientation_faces_the_equator_in_the_southern_hemisphere():
+    default = _annual()
+    assert default == _annual(roof_orientation="north")
+    assert default == _annual(roof_orientation="auto")
+    assert default > _annual(roof_orientation="south") * 1.1
+
+
+def test_usable_area_is_bounded():
+    with pytest.raises(ValidationError):
+        PanelPlacementRequest(**{**SYDNEY, "usable_area": MAX_ROOF_AREA + 1})
+    with pytest.raises(ValidationError):
+        PanelSweepRequest(**{**SYDNEY, "usable_area": 1e7})
+
+
+def test_sweep_compares_row_spacings():
+    request = PanelSweepRequest(**{**SYDNEY, "usable_area": 400}, tilts=[10, 30], row_spacings=[0.3, 2.0],
+                                panel_wattages=[400, 550])
+    result = asyncio.run(panel_placement.panel_placement_sweep(request))["data"]
+    assert result["scenarioCount"] == 8
+    by_spacing = {s["interRowSpacing"]: s["panelCount"] for s in result["scenarios"]}
+    assert by_spacing[0.3] > by_spacing[2.0]
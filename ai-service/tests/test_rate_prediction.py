@@ -0,0 +1,54 @@
+import asyncio
+import gc
+import weakref
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from routers import rate_prediction
+from schemas.models import RatePredictionRequest
+from services import model_loader
+
+REQUEST = RatePredictionRequest(region="Pakistan", current_rate=25.0, years_to_predict=5)
+
+
+def _save_model(path, slope: float):
+    years = np.arange(2010, 2025).reshape(-1, 1)
+    joblib.dump(LinearRegression().fit(years, slope * (years.ravel() - 2000)), path)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    _save_model(tmp_path / "rate_predictor.joblib", 0.5)
+    registry = model_loader.ModelRegistry(str(tmp_path), reload_interval=0)
+    monkeypatch.setattr(model_loader, "_registry", registry)
+    rate_prediction.forecast_rates.cache_clear()
+    yield registry
+    rate_prediction.forecast_rates.cache_clear()
+
+
+def _predict() -> dict:
+    return asyncio.run(rate_prediction.predict_electricity_rates(REQUEST))["data"]
+
+
+def test_reloaded_model_is_not_pinned_by_the_forecast_cache(registry, tmp_path):
+    first = _predict()
+    old_model = weakref.ref(registry.get("rate_predictor"))
+
+    _save_model(tmp_path / "rate_predictor.joblib", 1.0)
+    registry.reload()
+    second = _predict()
+
+    assert second["summary"]["modelVersion"] != first["summary"]["modelVersion"]
+    assert second["predictions"][0]["averageRate"] > first["predictions"][0]["averageRate"]
+    gc.collect()
+    assert old_model() is None
+
+
+def test_stale_version_raises_instead_of_caching(registry):
+    with pytest.raises(rate_prediction.ModelChangedError) as e:
+        rate_prediction.forecast_rates(REQUEST.region, 25.0, 5, "rate_predictor.joblib@0")
+    assert e.value.version == model_loader.get_model_version("rate_predictor", REQUEST.region)
+    assert rate_prediction.forecast_rates.cache_info().currsize == 0
@@ -0,0 +1,37 @@
+import asyncio
+import io
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from benchmarks.fixtures import synthetic_roof_image
+from config import get_settings
+from main import app
+from routers.roof_analysis import _read_zip_image
+
+
+def _archive(members: dict) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+    return buf.getvalue()
+
+
+def test_zip_members_are_read_from_the_archive_file():
+    image = synthetic_roof_image(320, 240)
+    zf = zipfile.ZipFile(io.BytesIO(_archive({"roof.jpg": image, "notes.txt": b"hello"})))
+    assert asyncio.run(_read_zip_image(zf, zf.getinfo("roof.jpg"))) == image
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(_read_zip_image(zf, zf.getinfo("notes.txt")))
+    assert e.value.status_code == 415
+
+
+def test_archive_over_the_cap_is_rejected_before_reading(monkeypatch):
+    monkeypatch.setattr(get_settings(), "ROOF_BATCH_MAX_ARCHIVE_BYTES", 100)
+    archive = _archive({"roof.jpg": synthetic_roof_image(320, 240)})
+    response = TestClient(app).post("/ai/roof-analysis/batch",
+                                    files={"archive": ("roofs.zip", archive, "application/zip")})
+    assert response.status_code == 413
@@ -0,0 +1,29 @@
+import pytest
+
+from benchmarks.fixtures import synthetic_roof_image
+from routers import roof_analysis
+from routers.roof_analysis import analyze_image_properties, derive_roof_from_image
+
+# Relative tolerance between reduced and full-resolution decode
+TOLERANCE = {"edge_density": 0.2, "laplacian_var": 0.1, "mean_brightness": 0.02, "mean_saturation": 0.02}
+
+
+@pytest.mark.parametrize("size", [(2048, 1536), (4000, 3000)])
+def test_reduced_decode_features_match_full_resolution(size):
+    contents = synthetic_roof_image(*size)
+    full = analyze_image_properties(contents, max_side=0)
+    reduced = analyze_image_properties(contents, max_side=1024)
+    assert reduced["analysis_scale"] < 1
+    for feature, tolerance in TOLERANCE.items():
+        assert reduced[feature] == pytest.approx(full[feature], rel=tolerance), feature
+    assert derive_roof_from_image(reduced, 28.6, 77.2)["roofType"] == derive_roof_from_image(full, 28.6, 77.2)["roofType"]
+
+
+
+def test_full_resolution_frames_are_not_kept_by_the_worker_thread():
+    analyze_image_properties(synthetic_roof_image(1280, 960), max_side=1024)
+    kept = roof_analysis._scratch.frames
+    assert kept is not None and kept.shape[:2] == (768, 1024)
+
+    analyze_image_properties(synthetic_roof_image(4000, 3000), max_side=0)
+    assert roof_analysis._scratch.frames is kept
@@ -0,0 +1,34 @@
+import json
+
+from services.tracing import SpanFileExporter, Trace
+
+
+def _trace(stages: int = 2) -> Trace:
+    trace = Trace()
+    trace.spans.extend((i + 1, None, f"stage{i}", 1_000 + i, 2_000 + i) for i in range(stages))
+    return trace
+
+
+def test_exported_traces_are_written_by_the_background_writer(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = SpanFileExporter(str(path))
+    traces = [_trace() for _ in range(50)]
+    for trace in traces:
+        exporter.export(trace, 1_000, 3_000, {"http.method": "GET", "http.route": "/ai/health",
+                                              "http.status_code": 200})
+    exporter.close()
+
+    documents = [json.loads(line) for line in path.read_text().splitlines()]
+    assert len(documents) == 50 and exporter.dropped == 0
+    spans = documents[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert spans[0]["name"] == "GET /ai/health"
+    assert spans[0]["traceId"] == f"{traces[0].trace_id:032x}"
+    assert [s["parentSpanId"] for s in spans[1:]] == [f"{traces[0].root_id:016x}"] * 2
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path):
+    exporter = SpanFileExporter(str(tmp_path / "traces.jsonl"), max_queue=1)
+    exporter._thread = object()  # no writer draining the queue
+    for _ in range(3):
+        exporter.export(_trace(), 0, 1, {})
+    assert exporter.dropped == 2
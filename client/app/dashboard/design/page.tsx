@@ -318,7 +318,6 @@ export default function DesignPage() {
                 lat: parseFloat(lat),
                 lng: parseFloat(lng),
                 roof_tilt: roofResult.estimatedTilt || selectedRoof.defaultTilt,
-                roof_orientation: 'south',
                 panel_wattage: 400,
             });
 
@@ -2,6 +2,7 @@ const DesignConfig = require('../models/DesignConfig');
 const ApiError = require('../utils/ApiError');
 const asyncHandler = require('../utils/asyncHandler');
 const axios = require('axios');
+const { logAiTiming } = require('../utils/aiTiming');
 
 const AI_SERVICE_URL = process.env.AI_SERVICE_URL || 'http://localhost:8000';
 
@@ -21,18 +22,22 @@ exports.analyzeRoof = asyncHandler(async (req, res) => {
             if (lng) formData.append('lng', lng.toString());
             formData.append('roof_area', roofArea.toString());
 
+            const startedAt = Date.now();
             const response = await axios.post(`${AI_SERVICE_URL}/ai/roof-analysis`, formData, {
                 timeout: 30000,
             });
+            logAiTiming('roof-analysis', response, startedAt);
             analysisResult = response.data;
         } else if (lat && lng) {
             // Use JSON endpoint when no file is uploaded
+            const startedAt = Date.now();
             const response = await axios.post(`${AI_SERVICE_URL}/ai/roof-analysis-json`, {
                 lat: parseFloat(lat),
                 lng: parseFloat(lng),
                 roof_area: roofArea,
                 roof_type: roof_type || null,
             }, { timeout: 30000 });
+            logAiTiming('roof-analysis-json', response, startedAt);
             analysisResult = response.data;
         } else {
             throw ApiError.badRequest('Provide either an image file or coordinates (lat, lng)');
@@ -105,7 +110,8 @@ exports.getPanelPlacement = asyncHandler(async (req, res) => {
     } = req.body;
 
     const effectiveTilt = parseFloat(roofTilt || roof_tilt) || 15;
-    const effectiveOrientation = roofOrientation || roof_orientation || 'south';
+    // Omitted means equator-facing; the AI service picks it from the latitude
+    const effectiveOrientation = roofOrientation || roof_orientation || undefined;
     const effectiveWattage = parseInt(panelWattage || panel_wattage) || 400;
     const effectiveUsableArea = parseFloat(usable_area || usableArea) || 75;
 
@@ -117,6 +123,7 @@ exports.getPanelPlacement = asyncHandler(async (req, res) => {
 
     let placementData;
     try {
+        const startedAt = Date.now();
         const response = await axios.post(`${AI_SERVICE_URL}/ai/panel-placement`, {
             usable_area: design?.roofAnalysis?.usableArea || effectiveUsableArea,
             lat: parseFloat(lat) || 28.6139,
@@ -125,6 +132,7 @@ exports.getPanelPlacement = asyncHandler(async (req, res) => {
             roof_orientation: effectiveOrientation,
             panel_wattage: effectiveWattage,
         }, { timeout: 30000 });
+        logAiTiming('panel-placement', response, startedAt);
         placementData = response.data?.data || response.data;
     } catch (err) {
         console.error('AI service panel-placement error:', err.message);
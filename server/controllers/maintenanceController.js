@@ -3,6 +3,7 @@ const User = require('../models/User');
 const ApiError = require('../utils/ApiError');
 const asyncHandler = require('../utils/asyncHandler');
 const axios = require('axios');
+const { logAiTiming } = require('../utils/aiTiming');
 
 const AI_SERVICE_URL = process.env.AI_SERVICE_URL || 'http://localhost:8000';
 
@@ -22,10 +23,12 @@ exports.getDustStatus = asyncHandler(async (req, res) => {
 
     let dustData;
     try {
+        const startedAt = Date.now();
         const response = await axios.get(
             `${AI_SERVICE_URL}/ai/dust/current/${lat}/${lng}`,
             { params: { days_since_cleaning: daysSinceClean }, timeout: 15000 }
         );
+        logAiTiming('dust/current', response, startedAt);
         dustData = response.data.data;
     } catch (err) {
         console.error('AI dust-status error:', err.message);
@@ -87,12 +90,14 @@ exports.getCleaningSchedule = asyncHandler(async (req, res) => {
 
     let schedule;
     try {
+        const startedAt = Date.now();
         const response = await axios.post(`${AI_SERVICE_URL}/ai/dust/cleaning-schedule`, {
             lat, lng,
             user_id: req.user._id.toString(),
             days_since_cleaning: daysSinceClean,
             capacity_kw: capacityKw,
         }, { timeout: 20000 });
+        logAiTiming('dust/cleaning-schedule', response, startedAt);
         schedule = response.data.data;
     } catch (err) {
         console.error('AI cleaning-schedule error:', err.message);
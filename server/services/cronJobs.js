@@ -1,3 +1,4 @@
+const readline = require('readline');
 const cron = require('node-cron');
 const axios = require('axios');
 const User = require('../models/User');
@@ -5,6 +6,7 @@ const { sendCleaningAlert } = require('./notificationService');
 const logger = require('../utils/logger');
 
 const AI_SERVICE_URL = process.env.AI_SERVICE_URL || 'http://localhost:8000';
+const DUST_BATCH_SIZE = 5000;
 
 // Daily dust check at 8 AM
 const startDustMonitoringJob = () => {
@@ -18,28 +20,59 @@ const startDustMonitoringJob = () => {
                 'properties.0': { $exists: true },
             });
 
+            // Batched requests; the AI service dedupes nearby locations and
+            // streams one NDJSON result per site as it completes.
+            const usersById = new Map();
+            const sites = [];
             for (const user of users) {
+                const property = user.properties[0];
+                const lat = property.address?.coordinates?.lat;
+                const lng = property.address?.coordinates?.lng;
+                if (!lat || !lng) continue;
+                usersById.set(String(user._id), user);
+                sites.push({ site_id: String(user._id), lat, lng });
+            }
+            if (sites.length === 0) return;
+
+            for (let i = 0; i < sites.length; i += DUST_BATCH_SIZE) {
+                let response;
                 try {
-                    const property = user.properties[0];
-                    const lat = property.address?.coordinates?.lat;
-                    const lng = property.address?.coordinates?.lng;
-                    if (!lat || !lng) continue;
+                    response = await axios.post(`${AI_SERVICE_URL}/ai/dust/current/batch`, { sites: sites.slice(i, i + DUST_BATCH_SIZE) }, {
+                        responseType: 'stream',
+                        timeout: 120000,
+                    });
+                } catch (err) {
+                    // One failed chunk must not cost every later chunk its alerts
+                    logger.error('Dust monitoring batch failed', { offset: i, error: err.message });
+                    continue;
+                }
 
-                    let dustData;
+                const lines = readline.createInterface({ input: response.data, crlfDelay: Infinity });
+                for await (const line of lines) {
+                    if (!line.trim()) continue;
+                    let result;
                     try {
-                        const response = await axios.get(`${AI_SERVICE_URL}/ai/dust/current/${lat}/${lng}`, { timeout: 5000 });
-                        dustData = response.data.data;
+                        result = JSON.parse(line);
                     } catch {
-                        continue; // Skip if AI service is down
+                        continue;
+                    }
+                    const user = usersById.get(result.siteId);
+                    if (!user) continue;
+                    if (!result.success) {
+                        logger.warn('Dust assessment failed for site', { userId: result.siteId, error: result.error });
+                        continue;
                     }
 
-                    // Send alert if urgency > 60
-                    if (dustData.cleaningUrgency > 60) {
-                        await sendCleaningAlert(user, dustData);
-                        logger.info('Sent cleaning alert', { userId: user._id, urgency: dustData.cleaningUrgency });
+                    try {
+                        const dustData = result.data;
+                        // Send alert if urgency > 60
+                        if (dustData.cleaningUrgency > 60) {
+                            await sendCleaningAlert(user, dustData);
+                            logger.info('Sent cleaning alert', { userId: user._id, urgency: dustData.cleaningUrgency });
+                        }
+                    } catch (err) {
+                        logger.error('Error processing user for dust monitoring', { userId: user._id, error: err.message });
                     }
-                } catch (err) {
-                    logger.error('Error processing user for dust monitoring', { userId: user._id, error: err.message });
                 }
             }
         } catch (err) {
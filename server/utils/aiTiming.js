@@ -0,0 +1,28 @@
+const logger = require('./logger');
+
+// Parse a Server-Timing header ("decode;dur=10.2, canny;dur=4.1;desc=\"x2\", total;dur=66.8")
+// into { decode: 10.2, canny: 4.1, total: 66.8 } (milliseconds)
+const parseServerTiming = (header) => {
+    const stages = {};
+    for (const entry of String(header).split(',')) {
+        const [name, ...params] = entry.trim().split(';');
+        if (!name) continue;
+        const dur = params.find((p) => p.trim().startsWith('dur='));
+        stages[name] = dur ? parseFloat(dur.trim().slice(4)) : null;
+    }
+    return stages;
+};
+
+// Log the AI service's per-stage timings (sent when it runs with TRACING_ENABLED)
+// alongside the round trip measured here
+const logAiTiming = (endpoint, response, startedAt) => {
+    const header = response?.headers?.['server-timing'];
+    if (!header) return;
+    logger.debug('AI service timing', {
+        endpoint,
+        roundTripMs: Date.now() - startedAt,
+        stages: parseServerTiming(header),
+    });
+};
+
+module.exports = { parseServerTiming, logAiTiming };